@@ -1,4 +1,5 @@
 from .model import KmeansData, KmeansCentroid
 from .scheme import KmeansDataCreate, \
     KmeansDataRead, KmeansDataDBCreate, \
-    KmeansCentroidCreate, KmeansFit, KmeansCentroidRead
\ No newline at end of file
+    KmeansCentroidCreate, KmeansFit, KmeansCentroidRead, \
+    KmeansSweepCreate, KmeansSweepRead, PCAInit
\ No newline at end of file
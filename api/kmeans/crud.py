@@ -123,6 +123,7 @@ async def create_kmeans_centroid(
     kmeans_centroid_model = KmeansCentroid(
         values=kmeans_centroid_scheme.values,
         fit_time=kmeans_centroid_scheme.fit_time,
+        metrics=kmeans_centroid_scheme.metrics,
         kmeans_data_id=kmeans_centroid_scheme.kmeans_data_id
     )
     db.add(kmeans_centroid_model)
@@ -170,6 +171,24 @@ async def read_kmeans_centroids(
     return kmeans_centroid_list
 
 
+async def read_latest_kmeans_centroid(
+        db: AsyncSession,
+        kmeans_data_id: UUID,
+        /
+) -> KmeansCentroid:
+    query = select(KmeansCentroid).where(
+        KmeansCentroid.kmeans_data_id == kmeans_data_id
+    ).order_by(KmeansCentroid.fit_at.desc()).limit(1)
+    result = await db.execute(query)
+    kmeans_centroid_model = result.scalars().first()
+    if kmeans_centroid_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Kmeans_centroid not found'
+        )
+    return kmeans_centroid_model
+
+
 async def delete_kmeans_data(
         db: AsyncSession,
         kmeans_data_id: UUID,
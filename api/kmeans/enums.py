@@ -4,9 +4,33 @@ from enum import Enum
 class KmeansInit(str, Enum):
 
     kmeans_pp = 'kmeans++'
+    kmeans_parallel = 'kmeans||'
+    afk_mc2 = 'afk-mc2'
     random = 'random'
 
 
+class KmeansAlgorithm(str, Enum):
+
+    lloyd = 'lloyd'
+    elkan = 'elkan'
+    hamerly = 'hamerly'
+    yinyang = 'yinyang'
+    minibatch = 'minibatch'
+    bisecting = 'bisecting'
+
+
+class BisectingStrategy(str, Enum):
+
+    largest_sse = 'largest_sse'
+    largest_cluster = 'largest_cluster'
+
+
+class KmeansDtype(str, Enum):
+
+    float32 = 'float32'
+    float64 = 'float64'
+
+
 class Normalization(str, Enum):
 
     z_score = 'z_score'
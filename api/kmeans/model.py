@@ -42,6 +42,7 @@ class KmeansCentroid(Base):
     values: Mapped[list[list[float]]] = mapped_column(ARRAY(Float), nullable=False)
     fit_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     fit_time: Mapped[float] = mapped_column(Float, nullable=False)
+    metrics: Mapped[dict] = mapped_column(JSONB, nullable=True)
     kmeans_data_id: Mapped[UUID] = mapped_column(db_uuid(as_uuid=True), ForeignKey('kmeans_data.id', ondelete='CASCADE'), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
@@ -1,14 +1,16 @@
 from typing import Annotated
 from time import perf_counter
-from fastapi import APIRouter, Depends, BackgroundTasks, status
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from numpy import ndarray
+from numpy import ndarray, array
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.decomposition import PCA
 from database import get_db
 from database.session import Async_Session_Local
-from kmeans import Kmeans
+from kmeans import Kmeans, KmeansSweep
+from kmeans.metrics import fit_metrics
 from . import (
     crud,
     KmeansDataCreate,
@@ -16,7 +18,10 @@ from . import (
     KmeansCentroidCreate,
     KmeansFit,
     KmeansCentroidRead,
-    KmeansDataRead
+    KmeansDataRead,
+    KmeansSweepCreate,
+    KmeansSweepRead,
+    PCAInit
 )
 from core.async_redis import rate_limit
 
@@ -28,40 +33,93 @@ kmeans_router = APIRouter(
 )
 
 
+def preprocess(
+        X: ndarray,
+        normalization: str | None,
+        pca: PCAInit | None
+) -> ndarray:
+    if normalization:
+        if normalization == 'z_score':
+            X = StandardScaler().fit_transform(X)
+        else:
+            X = MinMaxScaler().fit_transform(X)
+    if pca:
+        X = PCA(
+            n_components=pca.n_components,
+            random_state=pca.random_state
+        ).fit_transform(X)
+    return X
+
+
+def kmeans_sweep(
+        kmeans_sweep_scheme: KmeansSweepCreate,
+        X: ndarray
+) -> list[KmeansSweepRead]:
+    X = preprocess(X, kmeans_sweep_scheme.normalization, kmeans_sweep_scheme.pca)
+    sweep_scheme = kmeans_sweep_scheme.sweep
+    sweep = KmeansSweep(
+        range(sweep_scheme.k_min, sweep_scheme.k_max + 1),
+        sweep_scheme.random_state,
+        max_iter=sweep_scheme.max_iter,
+        tol=sweep_scheme.tol,
+        algorithm=sweep_scheme.algorithm,
+        n_local_trials=sweep_scheme.n_local_trials,
+        silhouette_size=sweep_scheme.silhouette_size,
+        n_jobs=-1,
+        dtype=X.dtype
+    ).fit(X)
+    return [
+        KmeansSweepRead(
+            n_clusters=k,
+            inertia=sweep.inertia_[i],
+            silhouette=None if sweep.silhouette_ is None else sweep.silhouette_[i]
+        )
+        for i, k in enumerate(sweep.k_values)
+    ]
+
+
 async def kmeans_fit_background(
         kmeans_data_scheme: KmeansDataCreate,
-        X: ndarray
+        X: ndarray,
+        init_centroids: ndarray | None = None
 ):
     async with Async_Session_Local() as db:
         kmeans = Kmeans()
+        coreset = kmeans_data_scheme.coreset
+        use_coreset = coreset is not None and X.shape[0] >= coreset.min_samples
         try:
             kmeans_data_db_scheme = KmeansDataDBCreate(
                 n_clusters=kmeans_data_scheme.kmeans.n_clusters,
                 preprocessing={
                     'normalization': kmeans_data_scheme.normalization,
-                    'pca': 'False' if kmeans_data_scheme.pca is None else 'True'
+                    'pca': 'False' if kmeans_data_scheme.pca is None else 'True',
+                    'coreset': 'True' if use_coreset else 'False',
+                    'dtype': X.dtype.name
                 },
                 description=kmeans_data_scheme.description,
                 chat_id=kmeans_data_scheme.chat_id
             )
             kmeans_data_model = await crud.create_kmeans_data(db, kmeans_data_db_scheme)
-            if kmeans_data_scheme.normalization:
-                if kmeans_data_scheme.normalization == 'z_score':
-                    X = StandardScaler().fit_transform(X)
-                else:
-                    X = MinMaxScaler().fit_transform(X)
-            if kmeans_data_scheme.pca:
-                X = PCA(
-                    n_components=kmeans_data_scheme.pca.n_components,
-                    random_state=kmeans_data_scheme.pca.random_state
-                ).fit_transform(X)
+            X = preprocess(X, kmeans_data_scheme.normalization, kmeans_data_scheme.pca)
             for field, value in kmeans_data_scheme.kmeans.model_dump().items():
                 setattr(kmeans, field, value)
+            kmeans.dtype = X.dtype
+            if init_centroids is not None:
+                kmeans.init = init_centroids
+            if use_coreset:
+                kmeans.coreset_size = coreset.size
             start_time = perf_counter()
             centroids = kmeans.fit(X).centroids.tolist()
+            fit_time = perf_counter() - start_time
             kmeans_centroid_scheme = KmeansCentroidCreate(
                 values=centroids,
-                fit_time=perf_counter() - start_time,
+                fit_time=fit_time,
+                metrics=fit_metrics(
+                    kmeans,
+                    X,
+                    kmeans_data_scheme.silhouette_size,
+                    kmeans_data_scheme.kmeans.random_state
+                ),
                 kmeans_data_id=kmeans_data_model.id
             )
             await crud.create_kmeans_centroid(db, kmeans_centroid_scheme)
@@ -79,16 +137,52 @@ async def kmeans_fit_background(
 async def fit_kmeans(
         kmeans_data_scheme: KmeansDataCreate,
         kmeans_fit_scheme: KmeansFit,
-        background_tasks: BackgroundTasks
+        background_tasks: BackgroundTasks,
+        db: Annotated[AsyncSession, Depends(get_db)]
 ):
+    init_centroids = None
+    if kmeans_data_scheme.warm_start_from is not None:
+        if kmeans_data_scheme.kmeans.algorithm == 'bisecting':
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail='Bisecting Kmeans does not support warm start'
+            )
+        kmeans_centroid_model = await crud.read_latest_kmeans_centroid(db, kmeans_data_scheme.warm_start_from)
+        init_centroids = array(kmeans_centroid_model.values, dtype=kmeans_fit_scheme.X.dtype)
+        n_features = kmeans_fit_scheme.X.shape[1] if kmeans_data_scheme.pca is None \
+            else kmeans_data_scheme.pca.n_components
+        if init_centroids.shape != (kmeans_data_scheme.kmeans.n_clusters, n_features):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail='Warm start centroids do not match n_clusters and the number of features'
+            )
     background_tasks.add_task(
         kmeans_fit_background,
         kmeans_data_scheme,
-        kmeans_fit_scheme.X
+        kmeans_fit_scheme.X,
+        init_centroids
     )
     return {'status': 'Fit started'}
 
 
+@kmeans_router.post(
+    '/sweep',
+    summary='Kmeans fit for a range of n_clusters with inertia and silhouette',
+    status_code=status.HTTP_200_OK,
+    response_model=list[KmeansSweepRead]
+)
+async def sweep_kmeans(
+        kmeans_sweep_scheme: KmeansSweepCreate,
+        kmeans_fit_scheme: KmeansFit
+):
+    if kmeans_sweep_scheme.sweep.k_max > kmeans_fit_scheme.X.shape[0]:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail='k_max must not exceed the number of samples'
+        )
+    return await run_in_threadpool(kmeans_sweep, kmeans_sweep_scheme, kmeans_fit_scheme.X)
+
+
 @kmeans_router.delete(
     '/{kmeans_data_id}',
     summary='Delete kmeans_data',
@@ -1,9 +1,9 @@
 from datetime import datetime
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, ValidationInfo
 from fastapi import HTTPException, status
 from uuid import UUID
-from numpy import array, float64, take, isnan, where, nanmean
-from .enums import KmeansInit, Normalization
+from numpy import array, take, isnan, where, nanmean
+from .enums import KmeansInit, KmeansAlgorithm, BisectingStrategy, KmeansDtype, Normalization
 
 
 class PCAInit(BaseModel):
@@ -15,6 +15,15 @@ class PCAInit(BaseModel):
     random_state: int | None = 1
 
 
+class CoresetInit(BaseModel):
+    model_config = {
+        'extra': 'forbid'
+    }
+
+    size: int = Field(10000, gt=0)
+    min_samples: int = Field(100000, gt=0)
+
+
 class KmeansScheme(BaseModel):
     model_config = {
         'extra': 'forbid'
@@ -25,6 +34,13 @@ class KmeansScheme(BaseModel):
     tol: float = Field(1e-4, gt=0, lt=1)
     init: KmeansInit = KmeansInit.kmeans_pp
     random_state: int | None = 1
+    algorithm: KmeansAlgorithm = KmeansAlgorithm.lloyd
+    n_local_trials: int | None = Field(None, gt=0)
+    chain_length: int = Field(200, gt=0)
+    batch_size: int = Field(1024, gt=0)
+    n_init: int = Field(1, gt=0)
+    bisecting_strategy: BisectingStrategy = BisectingStrategy.largest_sse
+    time_budget: float | None = Field(None, gt=0)
 
 
 class KmeansDataCreate(BaseModel):
@@ -35,10 +51,64 @@ class KmeansDataCreate(BaseModel):
     kmeans: KmeansScheme
     normalization: Normalization | None = Normalization.z_score
     pca: PCAInit | None
+    coreset: CoresetInit | None = None
+    warm_start_from: UUID | None = None
+    silhouette_size: int | None = Field(10000, gt=1)
     description: str | None = None
     chat_id: UUID
 
 
+class KmeansSweepScheme(BaseModel):
+    model_config = {
+        'extra': 'forbid'
+    }
+
+    k_min: int = Field(2, gt=0)
+    k_max: int = Field(10, gt=0)
+    max_iter: int = 100
+    tol: float = Field(1e-4, gt=0, lt=1)
+    random_state: int | None = 1
+    algorithm: KmeansAlgorithm = KmeansAlgorithm.lloyd
+    n_local_trials: int | None = Field(None, gt=0)
+    silhouette_size: int | None = Field(10000, gt=1)
+
+
+    @field_validator('k_max')
+    def verify_k_max(cls, value, info: ValidationInfo):
+        if value < info.data.get('k_min', 1):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail='k_max must not be less than k_min'
+            )
+        return value
+
+
+    @field_validator('algorithm')
+    def verify_algorithm(cls, value):
+        if value == KmeansAlgorithm.bisecting:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail='Bisecting Kmeans does not support sweeps'
+            )
+        return value
+
+
+class KmeansSweepCreate(BaseModel):
+    model_config = {
+        'extra': 'forbid'
+    }
+
+    sweep: KmeansSweepScheme
+    normalization: Normalization | None = Normalization.z_score
+    pca: PCAInit | None = None
+
+
+class KmeansSweepRead(BaseModel):
+    n_clusters: int
+    inertia: float
+    silhouette: float | None = None
+
+
 class KmeansDataRead(BaseModel):
     model_config = {
         'from_attributes': True
@@ -68,6 +138,7 @@ class KmeansCentroidCreate(BaseModel):
 
     values: list[list[float]]
     fit_time: float
+    metrics: dict | None = None
     kmeans_data_id: UUID
 
 
@@ -80,6 +151,7 @@ class KmeansCentroidRead(BaseModel):
     values: list[list[float]]
     fit_at: datetime
     fit_time: float
+    metrics: dict | None = None
     kmeans_data: KmeansDataRead
 
 
@@ -88,12 +160,13 @@ class KmeansFit(BaseModel):
         'extra': 'forbid'
     }
 
+    dtype: KmeansDtype = KmeansDtype.float64
     X: list[list[float | None]]
 
 
     @field_validator('X')
-    def verify_X(cls, value):
-        X = array(value, dtype=float64)
+    def verify_X(cls, value, info: ValidationInfo):
+        X = array(value, dtype=info.data.get('dtype', KmeansDtype.float64).value)
         if X.ndim != 2:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
@@ -1 +1,9 @@
-from .kmeans_model import Kmeans
\ No newline at end of file
+from .kmeans_model import Kmeans
+from .kmeans_pp import KmeansPP
+from .kmeans_parallel import KmeansParallel
+from .kmeans_mc2 import KmeansMC2
+from .coreset import Coreset
+from .centroid_index import CentroidIndex
+from .sweep import KmeansSweep
+from .distance import DistanceEngine
+from .streaming import ChunkSource
\ No newline at end of file
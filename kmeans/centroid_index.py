@@ -0,0 +1,198 @@
+from numpy import ndarray, empty, full, zeros, inf, intp, sqrt, arange, argsort, \
+    flatnonzero, diff, unique, maximum
+from scipy.sparse import issparse, spmatrix, sparray
+from scipy.spatial import cKDTree
+from .distance import DistanceEngine
+from .kmeans_pp import KmeansPP
+
+
+class CentroidIndex:
+    """
+    Nearest-centroid index for fast assignment of new samples.
+
+    Brute force compares every sample with all centroids, which dominates
+    prediction for large `n_clusters`. The index trades a one-off build over
+    the centroids for cheaper queries:
+
+    - 'kdtree': a `scipy.spatial.cKDTree` over the centroids, effective for
+      low-dimensional data.
+    - 'pruned': centroids are clustered into groups with a center and a
+      radius. A sample is first compared with its most promising group;
+      groups whose lower bound d(x, g) - r_g is not below the best distance
+      so far are skipped, and samples closer to their centroid than half
+      the distance to its nearest other centroid stop right away.
+    - 'brute': the full distance matrix, as in training.
+
+    With `eps` = 0 all methods return the nearest centroid (up to ties and
+    rounding). With `eps` > 0 'kdtree' and 'pruned' may return a centroid
+    whose distance is at most (1 + eps) times the nearest one, and prune
+    accordingly more.
+
+    Attributes:
+        centroids (np.ndarray): Indexed centroids of shape (n_clusters, n_features).
+        method (str): Resolved query method: 'kdtree', 'pruned' or 'brute'.
+        eps (float): Allowed relative distance error; 0 is exact.
+        memory_budget (int): Upper limit in bytes for one block of the distance matrix.
+        n_jobs (int | None): Worker threads for the queries; -1 uses all cores.
+    """
+
+    def __init__(self,
+                 centroids: ndarray,
+                 /, *,
+                 method: str = 'auto',
+                 eps: float = 0.0,
+                 n_groups: int | None = None,
+                 leaf_size: int = 16,
+                 random_state: int | None = None,
+                 memory_budget: int = 2 ** 28,
+                 n_jobs: int | None = None):
+
+        if method == 'auto':
+            method = 'kdtree' if centroids.shape[1] <= 16 else 'pruned'
+        if method not in ('kdtree', 'pruned', 'brute'):
+            raise ValueError('Invalid index method')
+        if eps < 0:
+            raise ValueError('eps must be non-negative')
+        self.centroids = centroids
+        self.method = method
+        self.eps = eps
+        self.memory_budget = memory_budget
+        self.n_jobs = n_jobs
+        if method == 'kdtree':
+            self.__tree = cKDTree(centroids, leafsize=leaf_size)
+        elif method == 'pruned':
+            self.__build_groups(n_groups, random_state)
+
+    def __build_groups(self, n_groups: int | None, random_state: int | None, /):
+        """
+        Cluster the centroids into groups and precompute the pruning bounds.
+
+        Args:
+            n_groups (int | None): Number of groups; defaults to sqrt(n_clusters),
+                which balances the group and member distances of a query.
+            random_state (int | None): Seed for the grouping.
+
+        Notes:
+            - Groups come from KMeans++ seeding plus a few Lloyd steps on the
+              centroids; each group keeps its center, its radius and its members.
+            - The half distance from every centroid to its nearest other
+              centroid is computed once from the centroid-centroid distances.
+        """
+
+        n_clusters = self.centroids.shape[0]
+        n_groups = min(n_groups or max(1, round(sqrt(n_clusters))), n_clusters)
+        engine = DistanceEngine(self.centroids, self.memory_budget)
+        centers = KmeansPP(n_groups, random_state, memory_budget=self.memory_budget) \
+            .initialize_centroids(self.centroids)
+        sums = empty(centers.shape)
+        for _ in range(5):
+            group, _ = engine.nearest(centers)
+            totals = engine.cluster_sums(group, sums)
+            non_empty = totals > 0
+            centers[non_empty] = sums[non_empty] / totals[non_empty, None]
+        group, dist_sq = engine.nearest(centers)
+
+        present = unique(group)
+        order = argsort(group, kind='stable')
+        starts = flatnonzero(diff(group[order], prepend=-1))
+        radius = zeros(n_groups)
+        maximum.at(radius, group, sqrt(dist_sq))
+        self.__centers = centers[present]
+        self.__radius = radius[present]
+        self.__members = [order[start:stop] for start, stop in zip(starts, [*starts[1:], n_clusters])]
+        if n_clusters > 1:
+            _, _, second = engine.two_nearest(self.centroids, arange(n_clusters))
+            self.__half_gap = sqrt(second) / 2
+        else:
+            self.__half_gap = full(1, inf)
+
+    def __query_pruned(self, engine: DistanceEngine, /) -> tuple[ndarray, ndarray]:
+        """
+        Nearest centroid by group pruning.
+
+        Args:
+            engine (DistanceEngine): Distance engine built for the samples to assign.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Labels and distances (not squared)
+            to the returned centroid, both of shape (n_samples,).
+
+        Algorithm:
+            1. Compute d(x, g) to every group center and the lower bounds
+               d(x, g) - r_g, and visit the groups of each sample in
+               increasing order of their bound.
+            2. Compare the sample with the members of the first group; stop if
+               the distance u to the best member is at most half the distance
+               from that member to its nearest other centroid.
+            3. Visit the next groups while bound * (1 + eps) < u, updating u.
+               The bounds are sorted, so a sample stops at its first
+               skipped group.
+        """
+
+        n = engine.X.shape[0]
+        labels = empty(n, dtype=intp)
+        best = full(n, inf, dtype=engine.X.dtype)
+        n_columns = max(self.__centers.shape[0], max(members.size for members in self.__members))
+        slack = 1 + self.eps
+
+        def assign(chunk: slice):
+            rows = arange(chunk.start, chunk.stop)
+            bound = sqrt(engine.sq_distances(self.__centers, chunk)) - self.__radius
+            order = argsort(bound, axis=1)
+            active = arange(rows.size)
+            for rank in range(order.shape[1]):
+                visit = order[active, rank]
+                keep = bound[active, visit] * slack < best[rows[active]]
+                active, visit = active[keep], visit[keep]
+                if not active.size:
+                    break
+                for g in unique(visit):
+                    local = active[visit == g]
+                    members = self.__members[g]
+                    dist_sq = engine.sq_distances(self.centroids[members], rows[local])
+                    nearest = dist_sq.argmin(axis=1)
+                    dist = sqrt(dist_sq[arange(local.size), nearest])
+                    closer = dist < best[rows[local]]
+                    best[rows[local[closer]]] = dist[closer]
+                    labels[rows[local[closer]]] = members[nearest[closer]]
+                if rank == 0:
+                    active = active[best[rows[active]] > self.__half_gap[labels[rows[active]]]]
+
+        engine.map_chunks(assign, n, n_columns)
+        return labels, best
+
+    def query(self, X: ndarray | spmatrix | sparray, /) -> tuple[ndarray, ndarray]:
+        """
+        Assign samples to their nearest indexed centroid.
+
+        Args:
+            X (np.ndarray | scipy.sparse matrix): Samples of shape (n_samples, n_features).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Labels and squared distances to the
+            returned centroid, both of shape (n_samples,).
+
+        Notes:
+            - Sparse samples are densified chunk by chunk for 'kdtree'.
+        """
+
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs)
+        if self.method == 'brute':
+            return engine.nearest(self.centroids)
+        if self.method == 'pruned':
+            labels, dist = self.__query_pruned(engine)
+            return labels, dist ** 2
+
+        n = X.shape[0]
+        labels = empty(n, dtype=intp)
+        dist_sq = empty(n, dtype=X.dtype)
+        step = max(1, self.memory_budget // (8 * max(X.shape[1], 1)))
+        for start in range(0, n, step):
+            chunk = slice(start, min(start + step, n))
+            dist, labels[chunk] = self.__tree.query(
+                engine.dense(chunk) if issparse(X) else X[chunk],
+                eps=self.eps,
+                workers=engine.n_jobs
+            )
+            dist_sq[chunk] = dist ** 2
+        return labels, dist_sq
\ No newline at end of file
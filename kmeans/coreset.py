@@ -0,0 +1,99 @@
+from math import log
+from numpy import ndarray, bincount, unique, ones, maximum
+from numpy.random import default_rng
+from scipy.sparse import spmatrix, sparray
+from .distance import DistanceEngine, check_sample_weight
+from .kmeans_pp import KmeansPP
+
+
+class Coreset:
+    """
+    Sensitivity-sampling coreset for approximate KMeans on huge inputs.
+
+    A cheap KMeans++ pass picks `n_clusters` centers B. Every sample then
+    gets an upper bound on its sensitivity (its largest possible share of
+    the clustering cost) from its distance to B and the cost and size of
+    its B-cluster. `size` samples are drawn proportionally to these
+    bounds and reweighted by the inverse of their probability, so the
+    weighted cost of any set of centroids on the coreset estimates the cost
+    on the full data without bias.
+
+    Attributes:
+        n_clusters (int): Number of clusters the coreset is built for.
+        rng (np.random.Generator): NumPy random number generator, seeded for reproducibility.
+        size (int): Number of draws; repeated draws are merged, so the
+            coreset can have fewer points.
+        memory_budget (int): Upper limit in bytes for one block of the distance matrix.
+    """
+
+    def __init__(self,
+                 n_clusters: int = 2,
+                 random_state: int | None = None,
+                 /, *,
+                 size: int = 10000,
+                 memory_budget: int = 2 ** 28):
+
+        self.n_clusters = n_clusters
+        self.rng = default_rng(random_state)
+        self.size = size
+        self.memory_budget = memory_budget
+
+    def build(self,
+              X: ndarray | spmatrix | sparray,
+              /,
+              sample_weight: ndarray | None = None) -> tuple[ndarray | spmatrix | sparray, ndarray]:
+        """
+        Build a weighted coreset of `X`.
+
+        Args:
+            X (np.ndarray | scipy.sparse matrix): Input data of shape (n_samples, n_features).
+            sample_weight (np.ndarray | None): Weight of every sample, shape (n_samples,).
+
+        Returns:
+            tuple[np.ndarray | scipy.sparse matrix, np.ndarray]: Coreset points
+            (rows of `X`, same format) and their weights, to be passed to
+            `Kmeans.fit(points, weights)`.
+
+        Algorithm:
+            1. Seed B with weighted KMeans++ and assign every sample to its nearest center.
+            2. With d(x) the distance to B, phi = sum(w d^2) / W and, for the
+               B-cluster P(x) of x, phi_P = sum over P of w d^2 and W_P its weight,
+               bound the sensitivity by
+               s(x) = a d(x)^2 / phi + 2 a phi_P / (W_P phi) + 4 W / W_P,
+               with a = 16 (log k + 2).
+            3. Draw `size` samples with probability q(x) ~ w(x) s(x), give each
+               draw the weight w(x) / (size q(x)) and merge repeated draws.
+
+        Notes:
+            - Costs one seeding pass and one assignment pass over `X`;
+              inputs with at most `size` samples are returned as they are.
+        """
+
+        n = X.shape[0]
+        sample_weight = check_sample_weight(sample_weight, n)
+        weights = ones(n) if sample_weight is None else sample_weight
+        if n <= self.size:
+            return X, weights
+
+        centers = KmeansPP(
+            self.n_clusters,
+            self.rng,
+            memory_budget=self.memory_budget
+        ).initialize_centroids(X, sample_weight)
+        labels, dist_sq = DistanceEngine(X, self.memory_budget).nearest(centers)
+
+        alpha = 16 * (log(self.n_clusters) + 2)
+        total_weight = weights.sum()
+        cost = weights * dist_sq
+        phi = cost.sum() / total_weight + 1e-12
+        cluster_weight = maximum(bincount(labels, weights=weights, minlength=self.n_clusters), 1e-12)
+        cluster_cost = bincount(labels, weights=cost, minlength=self.n_clusters)
+        sensitivity = alpha * dist_sq / phi \
+            + 2 * alpha * cluster_cost[labels] / (cluster_weight[labels] * phi) \
+            + 4 * total_weight / cluster_weight[labels]
+
+        score = weights * sensitivity
+        prob = score / score.sum()
+        draws = self.rng.choice(n, size=self.size, p=prob)
+        ind, repeats = unique(draws, return_counts=True)
+        return X[ind], repeats * weights[ind] / (self.size * prob[ind])
\ No newline at end of file
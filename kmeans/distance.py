@@ -0,0 +1,455 @@
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from os import cpu_count
+from numpy import ndarray, einsum, maximum, empty, arange, intp, \
+    partition, full, inf, zeros, minimum, add, bincount, float64, asarray, ones, integer
+from numpy.typing import DTypeLike
+from scipy.sparse import issparse, csr_matrix, spmatrix, sparray
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+
+def limit_blas_threads(n_threads: int, /):
+    """
+    Context manager capping BLAS threads, so thread or process pools do not
+    oversubscribe the cores. A no-op when threadpoolctl is not installed.
+
+    Args:
+        n_threads (int): Maximum BLAS threads inside the context.
+
+    Returns:
+        Context manager.
+    """
+
+    if threadpool_limits is None:
+        return nullcontext()
+    return threadpool_limits(limits=n_threads, user_api='blas')
+
+
+def as_samples(X: ndarray | spmatrix | sparray, dtype: DTypeLike | None = None, /) -> ndarray | spmatrix | sparray:
+    """
+    Convert input samples to a dense array or a CSR matrix of `dtype`.
+
+    Args:
+        X (np.ndarray | scipy.sparse matrix): Samples of shape (n_samples, n_features).
+        dtype (DTypeLike | None): Target dtype; None keeps the input dtype.
+
+    Returns:
+        np.ndarray | scipy.sparse matrix: `X` itself when nothing has to change,
+        otherwise a converted copy. Sparse input stays sparse, in CSR format.
+    """
+
+    if issparse(X):
+        X = X.tocsr()
+        return X if dtype is None else X.astype(dtype, copy=False)
+    return asarray(X, dtype=dtype)
+
+
+def check_sample_weight(sample_weight: ndarray | None, n_samples: int, /) -> ndarray | None:
+    """
+    Validate per-sample weights.
+
+    Args:
+        sample_weight (np.ndarray | None): Weight of every sample, or None.
+        n_samples (int): Number of samples the weights belong to.
+
+    Returns:
+        np.ndarray | None: The weights as float64 of shape (n_samples,), or None.
+
+    Raises:
+        ValueError: If the shape does not match, a weight is negative or all are zero.
+    """
+
+    if sample_weight is None:
+        return None
+    sample_weight = asarray(sample_weight, dtype=float64)
+    if sample_weight.shape != (n_samples,):
+        raise ValueError('sample_weight must have shape (n_samples,)')
+    if (sample_weight < 0).any() or not sample_weight.any():
+        raise ValueError('sample_weight must be non-negative with a positive sum')
+    return sample_weight
+
+
+def scatter_add(sums: ndarray,
+                labels: ndarray,
+                X: ndarray | spmatrix | sparray,
+                weights: ndarray | None = None,
+                /):
+    """
+    Add every row of `X` to the row of `sums` given by its label, in place.
+
+    Args:
+        sums (np.ndarray): Accumulator of shape (n_clusters, n_features).
+        labels (np.ndarray): Target row of each sample, shape (n_samples,).
+        X (np.ndarray | scipy.sparse matrix): Samples of shape (n_samples, n_features).
+        weights (np.ndarray | None): Factor applied to every row; None adds the rows as is.
+
+    Notes:
+        - Sparse samples are summed with one sparse product between a
+          one-hot (n_clusters, n_samples) matrix, holding the weights, and
+          `X`, in the dtype of `sums`.
+        - When the accumulator dtype differs from `X` (e.g. float64 sums of
+          float32 samples) or rows are weighted, `add.at` would need a slow
+          casting loop or a scaled copy of `X`, so one weighted `bincount`
+          per feature is used instead; it accumulates in float64 natively.
+    """
+
+    if issparse(X):
+        one_hot = csr_matrix(
+            (ones(labels.size, dtype=sums.dtype) if weights is None else weights.astype(sums.dtype),
+             (labels, arange(labels.size))),
+            shape=(sums.shape[0], labels.size)
+        )
+        sums += (one_hot @ X).toarray()
+        return
+    if weights is None and sums.dtype == X.dtype:
+        add.at(sums, labels, X)
+        return
+    for j in range(X.shape[1]):
+        column = X[:, j] if weights is None else X[:, j] * weights
+        sums[:, j] += bincount(labels, weights=column, minlength=sums.shape[0])
+
+
+class DistanceEngine:
+    """
+    Squared Euclidean distances between samples and centroids.
+
+    Distances are expanded as ||x||^2 - 2 x.c^T + ||c||^2, so the heavy work
+    is one matrix product (BLAS) per chunk. Sample norms are computed once
+    and cached, and `X` is processed in row chunks so that no distance block
+    is larger than `memory_budget` bytes.
+
+    Work is done in the dtype of `X`: centroids are cast to it, and distance
+    blocks and per-sample buffers share it, so a float32 `X` never gets
+    upcast to float64.
+
+    Optional `sample_weight` scales each sample's contribution to the
+    cluster sums, the inertia and the seeding potentials; distances and
+    assignments do not depend on it.
+
+    `X` may also be a SciPy sparse matrix in CSR format: the cross term is a
+    sparse-dense product, row norms are taken from the stored entries only,
+    and centroids stay dense.
+
+    With `n_jobs` above 1, row blocks are processed by a thread pool (NumPy
+    and BLAS release the GIL) with BLAS limited to one thread per worker.
+    The budget is shared between the workers, and per-block results are
+    merged in block order, so results are reproducible for a given `n_jobs`.
+
+    Attributes:
+        X (np.ndarray | scipy.sparse matrix): Samples of shape (n_samples, n_features).
+        memory_budget (int): Upper limit in bytes for the distance blocks alive at once.
+        n_jobs (int): Worker threads; -1 in the constructor means all cores, None one thread.
+        sample_weight (np.ndarray | None): Weight of every sample, shape (n_samples,);
+            None weights all samples equally.
+        sq_norms (np.ndarray): Cached squared norm of every sample, shape (n_samples,).
+    """
+
+    def __init__(self,
+                 X: ndarray | spmatrix | sparray,
+                 memory_budget: int = 2 ** 28,
+                 n_jobs: int | None = None,
+                 /, *,
+                 sample_weight: ndarray | None = None):
+
+        self.X = X
+        self.memory_budget = memory_budget
+        self.n_jobs = cpu_count() if n_jobs == -1 else (n_jobs or 1)
+        self.sample_weight = sample_weight
+        if issparse(X):
+            self.sq_norms = asarray(X.multiply(X).sum(axis=1)).ravel()
+        else:
+            self.sq_norms = einsum('ij,ij->i', X, X)
+
+    def dense(self, rows: int | slice | ndarray, /) -> ndarray:
+        """
+        Selected samples as a dense array, e.g. to become centroids.
+
+        Args:
+            rows (int | slice | np.ndarray): Samples to take.
+
+        Returns:
+            np.ndarray: A copy of the rows, 1D for an integer index, else 2D.
+        """
+
+        if not issparse(self.X):
+            return self.X[rows].copy()
+        dense = self.X[rows].toarray()
+        return dense[0] if isinstance(rows, (int, integer)) else dense
+
+    def chunks(self, n_rows: int, n_columns: int, /, *, block_budget: int | None = None) -> Iterator[slice]:
+        """
+        Split `n_rows` rows into slices whose distance block fits the budget.
+
+        Args:
+            n_rows (int): Number of rows to split.
+            n_columns (int): Number of distance columns computed per row.
+            block_budget (int | None): Tighter limit in bytes for the blocks
+                of the whole pool, e.g. to keep elementwise work in cache.
+
+        Yields:
+            slice: Consecutive row ranges covering `range(n_rows)`.
+
+        Notes:
+            - With several workers, each block gets budget / n_jobs bytes and
+              there are at least n_jobs blocks.
+        """
+
+        budget = self.memory_budget if block_budget is None else min(self.memory_budget, block_budget)
+        step = max(1, budget // (8 * max(n_columns, 1) * self.n_jobs))
+        if self.n_jobs > 1:
+            step = min(step, max(1, -(-n_rows // self.n_jobs)))
+        for start in range(0, n_rows, step):
+            yield slice(start, min(start + step, n_rows))
+
+    def map_chunks(self,
+                   func: Callable[[slice], object],
+                   n_rows: int,
+                   n_columns: int,
+                   /, *,
+                   block_budget: int | None = None) -> list:
+        """
+        Apply `func` to every row chunk, in a thread pool when `n_jobs` > 1.
+
+        Args:
+            func (Callable): Function of a row slice.
+            n_rows (int): Number of rows to split.
+            n_columns (int): Number of distance columns computed per row.
+            block_budget (int | None): Tighter block limit, see `chunks`.
+
+        Returns:
+            list: Results of `func` in chunk order.
+        """
+
+        chunks = list(self.chunks(n_rows, n_columns, block_budget=block_budget))
+        if self.n_jobs == 1 or len(chunks) == 1:
+            return [func(chunk) for chunk in chunks]
+        with limit_blas_threads(1), ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            return list(pool.map(func, chunks))
+
+    def sq_distances(self, centroids: ndarray, rows: slice | ndarray = slice(None), /) -> ndarray:
+        """
+        Squared distances from the selected samples to all centroids.
+
+        Args:
+            centroids (np.ndarray): Centroids of shape (n_clusters, n_features).
+            rows (slice | np.ndarray): Samples to use; all of them by default.
+
+        Returns:
+            np.ndarray: Distances of shape (n_rows, n_clusters), clipped at zero.
+
+        Notes:
+            - The block is not chunked; callers pick `rows` from `chunks`.
+        """
+
+        centroids = centroids.astype(self.X.dtype, copy=False)
+        c_sq_norms = einsum('ij,ij->i', centroids, centroids)
+        dist_sq = self.X[rows] @ centroids.T
+        dist_sq *= -2
+        dist_sq += self.sq_norms[rows, None]
+        dist_sq += c_sq_norms
+        return maximum(dist_sq, 0, out=dist_sq)
+
+    def nearest(self, centroids: ndarray, rows: ndarray | None = None, /) -> tuple[ndarray, ndarray]:
+        """
+        Closest centroid and its squared distance for every sample.
+
+        Args:
+            centroids (np.ndarray): Centroids of shape (n_clusters, n_features).
+            rows (np.ndarray | None): Indices of the samples to use; all of them by default.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Labels and squared distances to the
+            closest centroid, both of shape (n_rows,).
+
+        Notes:
+            - Argmin and minimum are taken chunk by chunk, so only one block
+              of the distance matrix per worker is alive at a time.
+        """
+
+        n = self.X.shape[0] if rows is None else rows.size
+        labels = empty(n, dtype=intp)
+        min_dist_sq = empty(n, dtype=self.X.dtype)
+
+        def assign(chunk: slice):
+            dist_sq = self.sq_distances(centroids, chunk if rows is None else rows[chunk])
+            labels[chunk] = dist_sq.argmin(axis=1)
+            min_dist_sq[chunk] = dist_sq[arange(dist_sq.shape[0]), labels[chunk]]
+
+        self.map_chunks(assign, n, centroids.shape[0])
+        return labels, min_dist_sq
+
+    def two_nearest(self, centroids: ndarray, rows: ndarray, /) -> tuple[ndarray, ndarray, ndarray]:
+        """
+        Closest centroid plus the closest and second-closest squared distance.
+
+        Args:
+            centroids (np.ndarray): Centroids of shape (n_clusters, n_features).
+            rows (np.ndarray): Indices of the samples to use.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Labels, squared distances
+            to the closest and to the second-closest centroid (inf if there is
+            only one centroid), each of shape (len(rows),).
+        """
+
+        labels = empty(rows.size, dtype=intp)
+        first = empty(rows.size, dtype=self.X.dtype)
+        second = full(rows.size, inf, dtype=self.X.dtype)
+
+        def assign(chunk: slice):
+            dist_sq = self.sq_distances(centroids, rows[chunk])
+            labels[chunk] = dist_sq.argmin(axis=1)
+            first[chunk] = dist_sq[arange(dist_sq.shape[0]), labels[chunk]]
+            if centroids.shape[0] > 1:
+                second[chunk] = partition(dist_sq, 1, axis=1)[:, 1]
+
+        self.map_chunks(assign, rows.size, centroids.shape[0])
+        return labels, first, second
+
+    def paired_sq_distances(self, rows: ndarray, centroids: ndarray, labels: ndarray, /) -> ndarray:
+        """
+        Squared distance from each selected sample to one given centroid.
+
+        Args:
+            rows (np.ndarray): Indices of the samples.
+            centroids (np.ndarray): Centroids of shape (n_clusters, n_features).
+            labels (np.ndarray): Centroid index paired with each entry of `rows`.
+
+        Returns:
+            np.ndarray: Squared distances of shape (len(rows),).
+
+        Notes:
+            - The work is purely elementwise, so blocks are capped at 4 MiB
+              and their temporaries stay in cache.
+        """
+
+        centroids = centroids.astype(self.X.dtype, copy=False)
+        dist_sq = empty(rows.size, dtype=self.X.dtype)
+
+        def measure(chunk: slice):
+            paired = centroids[labels[chunk]]
+            if issparse(self.X):
+                dot = asarray(self.X[rows[chunk]].multiply(paired).sum(axis=1)).ravel()
+                measured = self.sq_norms[rows[chunk]] - 2 * dot + einsum('ij,ij->i', paired, paired)
+                dist_sq[chunk] = maximum(measured, 0)
+            else:
+                diff = self.X[rows[chunk]] - paired
+                dist_sq[chunk] = einsum('ij,ij->i', diff, diff)
+
+        self.map_chunks(measure, rows.size, centroids.shape[1], block_budget=2 ** 22)
+        return dist_sq
+
+    def inertia(self, centroids: ndarray, labels: ndarray, /) -> float:
+        """
+        Sum of squared distances from every sample to its labelled centroid.
+
+        Args:
+            centroids (np.ndarray): Centroids of shape (n_clusters, n_features).
+            labels (np.ndarray): Centroid index of each sample, shape (n_samples,)
+
+        Returns:
+            float: Within-cluster sum of squares, accumulated in float64.
+        """
+
+        return self.weighted_sum(self.paired_sq_distances(arange(self.X.shape[0]), centroids, labels))
+
+    def weighted_sum(self, values: ndarray, /) -> float:
+        """
+        Sum of a per-sample quantity, weighted by `sample_weight` if set.
+
+        Args:
+            values (np.ndarray): One value per sample, shape (n_samples,).
+
+        Returns:
+            float: The (weighted) sum, accumulated in float64.
+        """
+
+        if self.sample_weight is None:
+            return float(values.sum(dtype=float64))
+        return float(values @ self.sample_weight)
+
+    def cluster_totals(self, labels: ndarray, n_clusters: int, /, values: ndarray | None = None) -> ndarray:
+        """
+        Per-cluster sum of a per-sample quantity, weighted by `sample_weight` if set.
+
+        Args:
+            labels (np.ndarray): Cluster index of each sample, shape (n_samples,).
+            n_clusters (int): Number of clusters.
+            values (np.ndarray | None): One value per sample, shape (n_samples,);
+                None totals the sample weights, i.e. the cluster sizes.
+
+        Returns:
+            np.ndarray: Totals of shape (n_clusters,), accumulated in float64.
+        """
+
+        if values is None:
+            weights = self.sample_weight
+        else:
+            weights = values if self.sample_weight is None else values * self.sample_weight
+        return bincount(labels, weights=weights, minlength=n_clusters).astype(float64)
+
+    def cluster_sums(self, labels: ndarray, sums: ndarray, /) -> ndarray:
+        """
+        Per-cluster sums of the samples, written into `sums`.
+
+        Args:
+            labels (np.ndarray): Cluster index of each sample, shape (n_samples,).
+            sums (np.ndarray): Output buffer of shape (n_clusters, n_features);
+                its dtype is the accumulator dtype, e.g. float64 for a float32 `X`.
+
+        Returns:
+            np.ndarray: Number of samples in each cluster, or their total
+            weight when `sample_weight` is set, shape (n_clusters,).
+
+        Notes:
+            - With several workers, every block accumulates its own partial
+              sums, which are then added up in block order.
+        """
+
+        weights = self.sample_weight
+        sums.fill(0)
+        if self.n_jobs == 1:
+            scatter_add(sums, labels, self.X, weights)
+        else:
+            def accumulate(chunk: slice) -> ndarray:
+                partial = zeros(sums.shape, dtype=sums.dtype)
+                scatter_add(partial, labels[chunk], self.X[chunk], None if weights is None else weights[chunk])
+                return partial
+
+            for partial in self.map_chunks(accumulate, self.X.shape[0], sums.shape[1]):
+                sums += partial
+        return bincount(labels, weights=weights, minlength=sums.shape[0])
+
+    def candidate_potentials(self, candidates: ndarray, min_dist_sq: ndarray, /) -> ndarray:
+        """
+        Potential (sum of squared distances) after adding each candidate centroid.
+
+        Args:
+            candidates (np.ndarray): Candidate centroids of shape (n_candidates, n_features).
+            min_dist_sq (np.ndarray): Current squared distance from each sample to
+                its nearest centroid, shape (n_samples,).
+
+        Returns:
+            np.ndarray: Potential for each candidate, shape (n_candidates,),
+            weighted by `sample_weight` if set.
+
+        Notes:
+            - All candidates are scored in one chunked pass over the samples.
+        """
+
+        def score(chunk: slice) -> ndarray:
+            dist_sq = self.sq_distances(candidates, chunk)
+            minimum(dist_sq, min_dist_sq[chunk, None], out=dist_sq)
+            if self.sample_weight is None:
+                return dist_sq.sum(axis=0)
+            return self.sample_weight[chunk] @ dist_sq
+
+        potentials = zeros(candidates.shape[0])
+        for partial in self.map_chunks(score, self.X.shape[0], candidates.shape[0]):
+            potentials += partial
+        return potentials
@@ -0,0 +1,90 @@
+from numpy import ndarray, empty, ones
+from numpy.random import default_rng
+from scipy.sparse import spmatrix, sparray
+from .distance import DistanceEngine, check_sample_weight
+
+
+class KmeansMC2:
+    """
+    Assumption-free K-MC² (AFK-MC²) clustering initialization.
+
+    Approximates KMeans++ seeding with Markov chain Monte Carlo. A proposal
+    distribution is built in a single pass over the data; every further
+    centroid is then picked by a short Metropolis-Hastings chain that only
+    evaluates distances for the `chain_length` proposed samples, so the cost
+    per centroid does not grow with n_samples.
+
+    Attributes:
+        n_clusters (int): Number of clusters to initialize.
+        rng (np.random.Generator): NumPy random number generator, seeded for reproducibility.
+        chain_length (int): Number of proposals in each Markov chain.
+        memory_budget (int): Upper limit in bytes for one block of the distance matrix.
+        n_jobs (int | None): Worker threads for the pass that builds the proposal; -1 uses all cores.
+    """
+
+    def __init__(self,
+                 n_clusters: int = 2,
+                 random_state: int | None = None,
+                 /, *,
+                 chain_length: int = 200,
+                 memory_budget: int = 2 ** 28,
+                 n_jobs: int | None = None):
+
+        self.n_clusters = n_clusters
+        self.rng = default_rng(random_state)
+        self.chain_length = chain_length
+        self.memory_budget = memory_budget
+        self.n_jobs = n_jobs
+
+    def initialize_centroids(self, X: ndarray | spmatrix | sparray, /, sample_weight: ndarray | None = None) -> ndarray:
+        """
+        Initialize centroids using the AFK-MC² algorithm.
+
+        Args:
+            X (np.ndarray | scipy.sparse matrix): Input data of shape (n_samples, n_features).
+            sample_weight (np.ndarray | None): Weight of every sample, shape (n_samples,).
+
+        Returns:
+            np.ndarray: Initialized centroids of shape (n_clusters, n_features).
+
+        Algorithm:
+            1. Select the first centroid randomly (proportionally to the weights w) from the data points.
+            2. Build the proposal q(x) = w(x) d(x, c1)^2 / (2 * sum) + w(x) / (2 * sum(w)),
+               with w = 1 when no weights are given.
+            3. For each remaining centroid:
+                a. Draw `chain_length` proposals from q.
+                b. Compute squared distances from the proposals to the chosen centroids.
+                c. Walk the chain, accepting proposal y over the current state x with
+                   probability min(1, w(y) d(y)^2 q(x) / (w(x) d(x)^2 q(y))).
+                d. The final state of the chain becomes the new centroid.
+        """
+
+        n = X.shape[0]
+        sample_weight = check_sample_weight(sample_weight, n)
+        weights = ones(n) if sample_weight is None else sample_weight
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs)
+        centroids = empty((self.n_clusters, X.shape[1]), dtype=X.dtype)
+        if sample_weight is None:
+            centroids[0] = engine.dense(self.rng.integers(0, n))
+        else:
+            centroids[0] = engine.dense(self.rng.choice(n, p=weights / weights.sum()))
+        if self.n_clusters == 1:
+            return centroids
+
+        _, dist_sq = engine.nearest(centroids[:1])
+        score = weights * dist_sq
+        proposal = 0.5 * score / (score.sum() + 1e-12) + 0.5 * weights / weights.sum()
+        proposal /= proposal.sum()
+
+        for i in range(1, self.n_clusters):
+            chain_ind = self.rng.choice(n, size=self.chain_length, p=proposal)
+            _, chain_dist_sq = DistanceEngine(X[chain_ind], self.memory_budget).nearest(centroids[:i])
+            weight = weights[chain_ind] * chain_dist_sq / proposal[chain_ind]
+            accept = self.rng.random(self.chain_length)
+            state = 0
+            for j in range(1, self.chain_length):
+                if weight[state] == 0 or weight[j] / weight[state] > accept[j]:
+                    state = j
+            centroids[i] = engine.dense(chain_ind[state])
+
+        return centroids
@@ -1,6 +1,24 @@
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from multiprocessing.shared_memory import SharedMemory
+from os import PathLike, cpu_count
+from time import time
 from .kmeans_pp import KmeansPP
-from numpy import ndarray, allclose
-from numpy.random import default_rng
+from .kmeans_parallel import KmeansParallel
+from .kmeans_mc2 import KmeansMC2
+from .coreset import Coreset
+from .centroid_index import CentroidIndex
+from .distance import DistanceEngine, limit_blas_threads, scatter_add, as_samples, check_sample_weight
+from .streaming import ChunkSource
+from numpy import ndarray, allclose, arange, sqrt, maximum, \
+    fill_diagonal, ones, nonzero, partition, where, array, full, \
+    argsort, minimum, flatnonzero, inf, diff, split, empty, bincount, zeros, \
+    concatenate, argpartition, float64, sort
+from numpy.linalg import norm
+from numpy.random import default_rng, SeedSequence
+from numpy.typing import DTypeLike
+from scipy.sparse import issparse, spmatrix, sparray
 from scipy.spatial.distance import cdist
 
 
@@ -16,10 +34,93 @@ class Kmeans:
         Maximum number of iterations of the KMeans algorithm.
     tol : float
         Convergence tolerance. If the change in centroids is less than this value, algorithm stops.
-    init : str
-        Method for initialization: 'kmeans++' or 'random'
+    init : str | ndarray
+        Method for initialization: 'kmeans++', 'kmeans||' (scalable k-means++
+        with a few oversampling passes), 'afk-mc2' (Markov chain approximation
+        of k-means++, sublinear in n_samples per centroid) or 'random'.
+        An array of shape (n_clusters, n_features) is used as the starting
+        centroids (warm start), e.g. those of a previous fit on similar data;
+        `n_init` is then ignored.
     random_state : int | None
         Seed for random number generator to ensure reproducibility.
+    algorithm : str
+        Iteration strategy: 'lloyd' (full distance matrix every iteration),
+        'elkan' (triangle-inequality bounds skip distances that cannot change
+        the assignment), 'hamerly' (a single lower bound per sample, best
+        for low-dimensional data) or 'yinyang' (one lower bound per group of
+        centroids, best for large `n_clusters`). All produce the same labels
+        and centroids. 'minibatch' instead updates centroids from random
+        batches of `batch_size` samples and only approximates them.
+        'bisecting' starts from one cluster and repeatedly splits one
+        cluster in two with 2-means on its own points, which is much cheaper
+        for large `n_clusters` and yields a cluster hierarchy.
+    bisecting_strategy : str
+        Cluster split next by 'bisecting': 'largest_sse' (largest
+        within-cluster sum of squares) or 'largest_cluster' (most samples,
+        or largest total weight).
+    n_groups : int | None
+        Number of centroid groups for 'yinyang'. Defaults to n_clusters // 10.
+    max_bound_memory : int
+        Upper limit in bytes for the per-group lower bounds of 'yinyang';
+        `n_groups` is reduced until the bounds fit.
+    memory_budget : int
+        Upper limit in bytes for one block of the sample-centroid distance
+        matrix; larger inputs are processed in row chunks.
+    n_local_trials : int | None
+        Candidates scored per step by greedy 'kmeans++' seeding; None keeps
+        the classic single draw.
+    chain_length : int
+        Length of each Markov chain for 'afk-mc2' seeding.
+    batch_size : int
+        Samples per batch for 'minibatch' and the expected size for `partial_fit`.
+    max_no_improvement : int
+        Consecutive batches without improvement of the smoothed inertia
+        after which mini-batch training is considered converged.
+    chunk_size : int
+        Rows per chunk when fitting out-of-core inputs (memmap, `.npy` path
+        or chunk iterables).
+    n_init : int
+        Number of independent initializations; the run with the lowest
+        inertia is kept. Each run gets its own RNG stream spawned from
+        `random_state`. Runs that have not started when the time budget runs
+        out are skipped.
+    n_jobs : int | None
+        Parallelism: with `n_init` > 1, worker processes for the runs, which
+        share one copy of `X`; otherwise threads for the seeding passes and
+        the assignment and update steps. None or 1 disables it, -1 uses all
+        cores. BLAS is limited to one thread per worker to avoid
+        oversubscription.
+    dtype : DTypeLike
+        Floating dtype of the whole computation: input data, seeding,
+        distances and centroids. float32 halves memory and roughly doubles
+        distance throughput at reduced precision.
+    sum_dtype : DTypeLike | None
+        Accumulator dtype for the per-cluster sums of the centroid update.
+        Defaults to float64 so float32 fits do not lose precision when
+        summing many samples; None accumulates in `dtype`.
+    coreset_size : int | None
+        If set and `X` has more samples, fit on a weighted sensitivity-
+        sampling coreset of about this many points instead of `X` (see
+        `Coreset`); labels and inertia still cover all of `X`. Trades a
+        bounded approximation error for speed on huge inputs.
+    sample_size : int | str | None
+        If set, seed and iterate on a uniform random subsample of this many
+        rows, then refine on all of `X`. 'auto' picks
+        max(100 * n_clusters, 2**28 // (n_clusters * n_features)) rows, so
+        an iteration costs about 2**28 distance terms; inputs that are not
+        larger than the subsample are fitted directly.
+    refine_iter : int
+        Full-data Lloyd iterations after a subsample or coreset fit; 0 runs
+        only the final full assignment pass that sets `labels_` (a descent
+        of the hierarchy for 'bisecting', which refinement discards).
+        `converged_` then reports the refinement, or the subsample fit when
+        this is 0.
+    time_budget : float | None
+        Wall-clock budget of `fit` in seconds. Once it is spent, iterations
+        stop and the current centroids are returned with `converged_` False.
+    deadline : float | None
+        Absolute `time.time()` timestamp with the same effect; the earlier of
+        the two applies.
 
     Attributes
     ----------
@@ -27,15 +128,66 @@ class Kmeans:
         Coordinates of cluster centers after fitting.
     labels_ : ndarray | None
         Labels of each point after fitting.
+    inertia_ : float | None
+        Sum of squared distances of samples to their closest centroid. After
+        `fit` it is measured against the returned `centroids`, like `score`.
+        For 'bisecting', each sample counts against the leaf it descended to.
+    counts_ : ndarray | None
+        Number of samples absorbed by each centroid during mini-batch training.
+    ewa_inertia_ : float | None
+        Exponentially smoothed per-sample batch inertia of mini-batch training.
+    converged_ : bool
+        Whether the last fit met its stopping criterion (centroid shift below
+        `tol`, or the smoothed inertia criterion of mini-batch training)
+        rather than `max_iter` or the time budget.
+    cluster_sse_ : ndarray | None
+        Within-cluster (weighted) sum of squares of every cluster under the
+        returned centroids, shape (n_clusters,); sums to `inertia_`. Not
+        tracked by `partial_fit`.
+    cluster_dist_ : ndarray | None
+        (Weighted) sum of the distances of every cluster's samples to its
+        returned centroid, shape (n_clusters,). Not tracked by `partial_fit`.
+    cluster_sizes_ : ndarray | None
+        Number of samples (total sample weight) of every cluster under the
+        returned centroids, shape (n_clusters,)
+    tree_children_ : ndarray | None
+        Hierarchy built by 'bisecting': child node indices of every node,
+        shape (n_nodes, 2), -1 for leaves. Node 0 is the root.
+    tree_centroids_ : ndarray | None
+        Centroid of every hierarchy node, shape (n_nodes, n_features)
+    tree_labels_ : ndarray | None
+        Cluster label of every leaf node, -1 for inner nodes, shape (n_nodes,)
+    index_ : CentroidIndex | None
+        Nearest-centroid index built by `build_index` and used by `predict`;
+        dropped whenever the model is fitted again.
     """
 
     def __init__(self,
                  n_clusters: int = 2,
                  max_iter: int = 100,
                  tol: float = 1e-4,
-                 init: str = 'kmeans++',
+                 init: str | ndarray = 'kmeans++',
                  random_state: int | None = None,
-                 /):
+                 /, *,
+                 algorithm: str = 'lloyd',
+                 n_groups: int | None = None,
+                 max_bound_memory: int = 2 ** 30,
+                 memory_budget: int = 2 ** 28,
+                 n_local_trials: int | None = None,
+                 chain_length: int = 200,
+                 batch_size: int = 1024,
+                 max_no_improvement: int = 10,
+                 chunk_size: int = 65536,
+                 n_init: int = 1,
+                 n_jobs: int | None = None,
+                 dtype: DTypeLike = float64,
+                 sum_dtype: DTypeLike | None = float64,
+                 coreset_size: int | None = None,
+                 sample_size: int | str | None = None,
+                 refine_iter: int = 0,
+                 bisecting_strategy: str = 'largest_sse',
+                 time_budget: float | None = None,
+                 deadline: float | None = None):
 
         self.n_clusters = n_clusters
         self.max_iter = max_iter
@@ -43,113 +195,1341 @@ class Kmeans:
         self.init = init
         self.centroids = None
         self.random_state = random_state
+        self.algorithm = algorithm
+        self.n_groups = n_groups
+        self.max_bound_memory = max_bound_memory
+        self.memory_budget = memory_budget
+        self.n_local_trials = n_local_trials
+        self.chain_length = chain_length
+        self.batch_size = batch_size
+        self.max_no_improvement = max_no_improvement
+        self.chunk_size = chunk_size
+        self.n_init = n_init
+        self.n_jobs = n_jobs
+        self.dtype = dtype
+        self.sum_dtype = sum_dtype
+        self.coreset_size = coreset_size
+        self.sample_size = sample_size
+        self.refine_iter = refine_iter
+        self.bisecting_strategy = bisecting_strategy
+        self.time_budget = time_budget
+        self.deadline = deadline
         self.labels_ = None
+        self.inertia_ = None
+        self.counts_ = None
+        self.ewa_inertia_ = None
+        self.converged_ = False
+        self.cluster_sse_ = None
+        self.cluster_dist_ = None
+        self.cluster_sizes_ = None
+        self.tree_children_ = None
+        self.tree_centroids_ = None
+        self.tree_labels_ = None
+        self.index_ = None
+        self.__sums = None
+        self.__deadline = None
+        self.__ewa_inertia_min = None
+        self.__no_improvement = 0
 
-    def __initialize_centroids(self, X: ndarray, /):
+    def __initialize_centroids(self, X: ndarray | spmatrix | sparray | ChunkSource, /, sample_weight: ndarray | None = None):
         """
         Initialize centroids for KMeans algorithm.
 
         Depending on `self.init`, centroids are initialized either using:
         - KMeans++ (via KmeansPP class)
+        - k-means|| (via KmeansParallel class)
+        - AFK-MC² (via KmeansMC2 class)
         - Random choice from the dataset
+        - A copy of an explicit centroid array
 
         Parameters
         ----------
-        X : ndarray
-            Input data of shape (n_samples, n_features)
+        X : ndarray | spmatrix | sparray | ChunkSource
+            Input data of shape (n_samples, n_features), dense or CSR, or a
+            chunk source for out-of-core fits. Centroids are always dense.
+        sample_weight : ndarray | None
+            Weight of every sample of an in-memory `X`; seeding draws samples
+            proportionally to it.
+
+        Raises
+        ------
+        ValueError
+            If `self.init` is unknown or not available for chunk sources, or
+            an explicit centroid array does not have shape (n_clusters, n_features).
         """
 
+        if isinstance(self.init, ndarray):
+            n_features = None if isinstance(X, ChunkSource) else X.shape[1]
+            if self.init.ndim != 2 or self.init.shape[0] != self.n_clusters \
+                    or self.init.shape[1] != (n_features or self.init.shape[1]):
+                raise ValueError('init centroids must have shape (n_clusters, n_features)')
+            self.centroids = self.init.astype(self.dtype)
+            return
+        if isinstance(X, ChunkSource) and self.init not in ('kmeans++', 'random'):
+            raise ValueError('Only kmeans++ and random init support out-of-core input')
         if self.init == 'kmeans++':
-            self.centroids = KmeansPP(self.n_clusters, self.random_state).initialize_centroids(X)
+            self.centroids = KmeansPP(
+                self.n_clusters,
+                self.random_state,
+                memory_budget=self.memory_budget,
+                n_local_trials=self.n_local_trials,
+                chunk_size=self.chunk_size,
+                dtype=self.dtype,
+                n_jobs=self.n_jobs
+            ).initialize_centroids(X, sample_weight)
+        elif self.init == 'kmeans||':
+            self.centroids = KmeansParallel(
+                self.n_clusters,
+                self.random_state,
+                memory_budget=self.memory_budget,
+                n_jobs=self.n_jobs
+            ).initialize_centroids(X, sample_weight)
+        elif self.init == 'afk-mc2':
+            self.centroids = KmeansMC2(
+                self.n_clusters,
+                self.random_state,
+                chain_length=self.chain_length,
+                memory_budget=self.memory_budget,
+                n_jobs=self.n_jobs
+            ).initialize_centroids(X, sample_weight)
+        elif self.init == 'random' and isinstance(X, ChunkSource):
+            self.centroids = self.__sample_rows(X)
         elif self.init == 'random':
             n_samples, m_features = X.shape[0], X.shape[1]
             rng = default_rng(self.random_state)
-            ind = rng.choice(n_samples, size=self.n_clusters, replace=False)
-            self.centroids = X[ind].copy()
+            prob = None if sample_weight is None else sample_weight / sample_weight.sum()
+            ind = rng.choice(n_samples, size=self.n_clusters, replace=False, p=prob)
+            self.centroids = X[ind].toarray() if issparse(X) else X[ind].copy()
         else:
             raise ValueError('Invalid init method')
 
-    def __calculate_distance(self, X: ndarray, /) -> ndarray:
+    def __sample_rows(self, source: ChunkSource, /) -> ndarray:
+        """
+        Draw `n_clusters` distinct rows uniformly from a chunk source in one pass.
+
+        Parameters
+        ----------
+        source : ChunkSource
+            Re-iterable source of row chunks.
+
+        Returns
+        -------
+        rows : ndarray
+            Sampled rows, shape (n_clusters, n_features)
+
+        Notes
+        -----
+        Every row gets a uniform random key and the rows with the smallest
+        keys are kept, so only n_clusters rows are held between chunks.
+        """
+
+        rng = default_rng(self.random_state)
+        rows, keys = None, None
+        for chunk in source:
+            chunk_keys = rng.random(chunk.shape[0])
+            rows = chunk if rows is None else concatenate([rows, chunk])
+            keys = chunk_keys if keys is None else concatenate([keys, chunk_keys])
+            if keys.size > self.n_clusters:
+                keep = argpartition(keys, self.n_clusters - 1)[:self.n_clusters]
+                rows, keys = rows[keep], keys[keep]
+        if keys is None or keys.size < self.n_clusters:
+            raise ValueError('Input has fewer samples than n_clusters')
+        return rows.copy()
+
+    def __calculate_distance(self, engine: DistanceEngine, /) -> tuple[ndarray, ndarray]:
         """
         Compute the closest centroid for each sample.
 
         Parameters
         ----------
-        X : ndarray
-            Data points, shape (n_samples, n_features)
+        engine : DistanceEngine
+            Distance engine built for the data points, shape (n_samples, n_features)
 
         Returns
         -------
         cluster_labels : ndarray
             Index of the nearest centroid for each sample, shape (n_samples,)
+        min_dist_sq : ndarray
+            Squared distance to that centroid, shape (n_samples,)
 
         Notes
         -----
         Uses squared Euclidean distance (same metric as KMeans++ initialization).
+        Labels and distances come out of the same chunked pass.
         """
 
-        dist_sq = cdist(X, self.centroids, 'sqeuclidean')
-        cluster_labels = dist_sq.argmin(axis=1)
-        return cluster_labels
+        return engine.nearest(self.centroids)
+
+    def __record_inertia(self, engine: DistanceEngine, dist_sq: ndarray, /):
+        """
+        Set `inertia_`, `cluster_sse_`, `cluster_dist_` and `cluster_sizes_` from the last assignment.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points, with their weights.
+        dist_sq : ndarray
+            Squared distance of every sample to the centroid of `self.labels_`.
+        """
+
+        self.cluster_sse_ = engine.cluster_totals(self.labels_, self.n_clusters, dist_sq)
+        self.cluster_dist_ = engine.cluster_totals(self.labels_, self.n_clusters, sqrt(dist_sq))
+        self.cluster_sizes_ = engine.cluster_totals(self.labels_, self.n_clusters)
+        self.inertia_ = float(self.cluster_sse_.sum())
+
+    def __out_of_time(self, /) -> bool:
+        """
+        Tell whether the time budget of the current fit is spent.
+        """
 
-    def __update_centroids(self, X: ndarray, /):
+        return self.__deadline is not None and time() >= self.__deadline
+
+    def __accumulator_dtype(self, /) -> DTypeLike:
+        """
+        Dtype of the per-cluster sum buffers.
+
+        Returns
+        -------
+        dtype : DTypeLike
+            `self.sum_dtype`, or `self.dtype` when it is None.
+        """
+
+        return self.dtype if self.sum_dtype is None else self.sum_dtype
+
+    def __update_centroids(self, engine: DistanceEngine, /):
         """
         Update cluster centroids based on current assignments.
 
         Parameters
         ----------
-        X : ndarray
-            Input data, shape (n_samples, n_features)
+        engine : DistanceEngine
+            Distance engine built for the input data, shape (n_samples, n_features)
 
         Notes
         -----
+        - Per-cluster sums and counts are accumulated in a single pass over `X`
+          into buffers that are reused across iterations; with `self.n_jobs`
+          threads, row blocks are summed in parallel and merged in order.
         - For each cluster, centroid is updated to the mean of assigned points.
         - If a cluster has no points, its previous centroid is kept.
         - Requires `self.labels_` to be already computed.
         """
 
-        for i in range(self.n_clusters):
-            centroid = X[self.labels_ == i]
-            if len(centroid) > 0:
-                self.centroids[i] = centroid.mean(axis=0)
+        if self.__sums is None or self.__sums.shape != self.centroids.shape:
+            self.__sums = empty(self.centroids.shape, dtype=self.__accumulator_dtype())
+        counts = engine.cluster_sums(self.labels_, self.__sums)
+        non_empty = counts > 0
+        self.centroids[non_empty] = self.__sums[non_empty] / counts[non_empty, None]
 
-    def fit(self, X: ndarray, /) -> 'Kmeans':
+    def __shift_centroids(self, engine: DistanceEngine, /) -> tuple[ndarray, bool]:
         """
-        Compute KMeans clustering.
+        Run one centroid update and measure how far each centroid moved.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the input data.
+
+        Returns
+        -------
+        shift : ndarray
+            Euclidean distance each centroid moved, shape (n_clusters,)
+        converged : bool
+            True if centroids changed less than `self.tol`.
+        """
+
+        old_centroids = self.centroids.copy()
+        self.__update_centroids(engine)
+        shift = norm(self.centroids - old_centroids, axis=1)
+        return shift, allclose(old_centroids, self.centroids, atol=self.tol)
+
+    def __fit_lloyd(self, engine: DistanceEngine, /, max_iter: int | None = None):
+        """
+        Plain Lloyd iterations: full assignment, then centroid update.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points to cluster.
+        max_iter : int | None
+            Iteration cap; defaults to `self.max_iter`.
+
+        Notes
+        -----
+        A final assignment pass against the returned centroids sets
+        `self.labels_` and the inertia, so they agree with `score` and
+        `predict`; with `max_iter` 0 only that pass runs.
+        """
+
+        for i in range(self.max_iter if max_iter is None else max_iter):
+            self.labels_, _ = self.__calculate_distance(engine)
+            old_centroids = self.centroids.copy()
+            self.__update_centroids(engine)
+            if allclose(old_centroids, self.centroids, atol=self.tol):
+                self.converged_ = True
+                break
+            if self.__out_of_time():
+                break
+        self.labels_, min_dist_sq = self.__calculate_distance(engine)
+        self.__record_inertia(engine, min_dist_sq)
+
+    def __fit_elkan(self, engine: DistanceEngine, /):
+        """
+        Lloyd iterations accelerated with Elkan's triangle-inequality bounds.
+
+        Keeps, for every sample, an upper bound on the distance to its own
+        centroid, a lower bound on the distance to every centroid and, as in
+        Hamerly's method, one lower bound on the distance to all other
+        centroids. A distance is only evaluated when the bounds cannot rule
+        out a change of assignment, so labels and centroids match `__fit_lloyd`.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points to cluster.
+
+        Notes
+        -----
+        - Memory is O(n_samples * n_clusters) for the lower bounds.
+        - Lower bounds are stored offset by the total distance `drift` every
+          centroid had moved when the bound was set, so the bound in force is
+          lower - drift. The single bound is offset the same way by the sum
+          of the largest move of every iteration. Centroid moves then cost
+          O(n_clusters), and the n_samples x n_clusters bounds are only read
+          for samples whose single bound fails.
+        - Samples that the bounds cannot settle get a full distance row in one
+          matrix product, which also refreshes all of their lower bounds.
+        """
+
+        n = engine.X.shape[0]
+        lower = empty((n, self.n_clusters), dtype=engine.X.dtype)
+        for chunk in engine.chunks(n, self.n_clusters):
+            lower[chunk] = engine.sq_distances(self.centroids, chunk)
+        self.labels_ = lower.argmin(axis=1)
+        sqrt(lower, out=lower)
+        upper = lower[arange(n), self.labels_]
+        lower[arange(n), self.labels_] = inf
+        second = lower.min(axis=1)
+        drift = zeros(self.n_clusters, dtype=engine.X.dtype)
+        max_drift = 0.0
+        for i in range(self.max_iter):
+            if i > 0:
+                self.__elkan_assign(engine, upper, lower, second, drift, max_drift)
+            shift, converged = self.__shift_centroids(engine)
+            upper += shift[self.labels_]
+            drift += shift
+            max_drift += shift.max()
+            if converged:
+                self.converged_ = True
+                break
+            if self.__out_of_time():
+                break
+        self.__elkan_assign(engine, upper, lower, second, drift, max_drift)
+        self.__record_inertia(
+            engine,
+            engine.paired_sq_distances(arange(engine.X.shape[0]), self.centroids, self.labels_)
+        )
+
+    def __elkan_assign(self,
+                       engine: DistanceEngine,
+                       upper: ndarray,
+                       lower: ndarray,
+                       second: ndarray,
+                       drift: ndarray,
+                       max_drift: float,
+                       /):
+        """
+        Elkan assignment step; updates `self.labels_` and the bounds in place.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points.
+        upper : ndarray
+            Upper bounds to the assigned centroid, shape (n_samples,)
+        lower : ndarray
+            Lower bounds to every centroid plus the drift of that centroid
+            when the bound was set, shape (n_samples, n_clusters)
+        second : ndarray
+            Lower bounds to the closest other centroid plus `max_drift` when
+            the bound was set, shape (n_samples,)
+        drift : ndarray
+            Total distance moved by every centroid so far, shape (n_clusters,)
+        max_drift : float
+            Sum over the iterations so far of the largest centroid move.
+
+        Notes
+        -----
+        Samples pass three filters of increasing cost: the O(1) separation
+        and single-bound tests, the n_clusters per-centroid bounds, and the
+        same bounds against the exact distance to the own centroid. Only the
+        rest is recomputed.
+        """
+
+        half_cc = 0.5 * cdist(self.centroids, self.centroids)
+        fill_diagonal(half_cc, inf)
+        separation = half_cc.min(axis=1)
+        active = flatnonzero(upper > maximum(separation[self.labels_], second - max_drift))
+        if active.size == 0:
+            return
+
+        def assign(chunk: slice):
+            rows = active[chunk]
+            bound = lower[rows]
+            bound -= drift
+            nearest_other = bound.min(axis=1)
+            second[rows] = nearest_other + max_drift
+            candidate = nearest_other < upper[rows]
+            rows, nearest_other = rows[candidate], nearest_other[candidate]
+            if not rows.size:
+                return
+            upper[rows] = sqrt(engine.paired_sq_distances(rows, self.centroids, self.labels_[rows]))
+            rows = rows[nearest_other < upper[rows]]
+            if not rows.size:
+                return
+            dist = sqrt(engine.sq_distances(self.centroids, rows))
+            nearest = dist.argmin(axis=1)
+            local = arange(rows.size)
+            self.labels_[rows] = nearest
+            upper[rows] = dist[local, nearest]
+            dist[local, nearest] = inf
+            second[rows] = dist.min(axis=1) + max_drift
+            dist += drift
+            lower[rows] = dist
+
+        engine.map_chunks(assign, active.size, self.n_clusters)
+
+    def __two_nearest(self, engine: DistanceEngine, rows: ndarray, /) -> tuple[ndarray, ndarray, ndarray]:
+        """
+        Find the nearest and second-nearest centroid distance for each sample.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points.
+        rows : ndarray
+            Indices of the samples to assign.
+
+        Returns
+        -------
+        cluster_labels : ndarray
+            Index of the nearest centroid, shape (len(rows),)
+        nearest : ndarray
+            Distance to the nearest centroid, shape (len(rows),)
+        second : ndarray
+            Distance to the second-nearest centroid (inf if n_clusters == 1).
+        """
+
+        cluster_labels, nearest, second = engine.two_nearest(self.centroids, rows)
+        return cluster_labels, sqrt(nearest), sqrt(second)
+
+    def __fit_hamerly(self, engine: DistanceEngine, /):
+        """
+        Lloyd iterations accelerated with Hamerly's single lower bound.
+
+        Keeps one upper bound to the assigned centroid and one lower bound to
+        the second-closest centroid per sample. Samples whose bounds are
+        separated skip the assignment step; the rest get a full distance row.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points to cluster.
+
+        Notes
+        -----
+        Memory is O(n_samples) for the bounds, which makes it the cheapest
+        accelerated mode on low-dimensional data with moderate `n_clusters`.
+        """
+
+        self.labels_, upper, lower = self.__two_nearest(engine, arange(engine.X.shape[0]))
+        for i in range(self.max_iter):
+            if i > 0:
+                self.__hamerly_assign(engine, upper, lower)
+            shift, converged = self.__shift_centroids(engine)
+            upper += shift[self.labels_]
+            if self.n_clusters > 1:
+                first, second = partition(shift, -2)[-1:-3:-1]
+                lower -= where(self.labels_ == shift.argmax(), second, first)
+            if converged:
+                self.converged_ = True
+                break
+            if self.__out_of_time():
+                break
+        self.__hamerly_assign(engine, upper, lower)
+        self.__record_inertia(
+            engine,
+            engine.paired_sq_distances(arange(engine.X.shape[0]), self.centroids, self.labels_)
+        )
+
+    def __hamerly_assign(self, engine: DistanceEngine, upper: ndarray, lower: ndarray, /):
+        """
+        Hamerly assignment step; updates `self.labels_` and the bounds in place.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points.
+        upper : ndarray
+            Upper bounds to the assigned centroid, shape (n_samples,)
+        lower : ndarray
+            Lower bounds to the second-closest centroid, shape (n_samples,)
+        """
+
+        separation = cdist(self.centroids, self.centroids)
+        fill_diagonal(separation, float('inf'))
+        separation = 0.5 * separation.min(axis=1)
+        bound = maximum(separation[self.labels_], lower)
+
+        active = nonzero(upper > bound)[0]
+        if active.size == 0:
+            return
+        upper[active] = sqrt(engine.paired_sq_distances(active, self.centroids, self.labels_[active]))
+        active = active[upper[active] > bound[active]]
+        if active.size == 0:
+            return
+        self.labels_[active], upper[active], lower[active] = self.__two_nearest(engine, active)
+
+    def __group_centroids(self, n_samples: int, /) -> tuple[ndarray, ndarray, ndarray]:
+        """
+        Partition the current centroids into groups for Yinyang filtering.
+
+        Parameters
+        ----------
+        n_samples : int
+            Number of samples, used to keep the bounds under `self.max_bound_memory`.
+
+        Returns
+        -------
+        group : ndarray
+            Group index of each centroid, shape (n_clusters,)
+        order : ndarray
+            Centroid indices sorted by group, shape (n_clusters,)
+        starts : ndarray
+            Offset of each group inside `order`, shape (n_groups,)
+        """
+
+        n_groups = self.n_groups or max(1, self.n_clusters // 10)
+        n_groups = min(n_groups, self.n_clusters, max(1, self.max_bound_memory // (8 * n_samples)))
+        if n_groups == self.n_clusters:
+            group = arange(self.n_clusters)
+        else:
+            group = Kmeans(n_groups, 5, self.tol, 'kmeans++', self.random_state) \
+                .fit(self.centroids).labels_
+        order = argsort(group, kind='stable')
+        starts = flatnonzero(diff(group[order], prepend=-1))
+        return group, order, starts
+
+    def __fit_yinyang(self, engine: DistanceEngine, /):
+        """
+        Lloyd iterations accelerated with Yinyang group filtering.
+
+        Centroids are clustered into groups once. Every sample keeps an upper
+        bound to its own centroid and one lower bound per group, so whole
+        groups are skipped when their bound exceeds the upper bound.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points to cluster.
+
+        Notes
+        -----
+        Memory is O(n_samples * n_groups) for the lower bounds, capped by
+        `self.max_bound_memory`.
+        """
+
+        n = engine.X.shape[0]
+        group, order, starts = self.__group_centroids(n)
+        members = split(order, starts[1:])
+        self.labels_ = empty(n, dtype=int)
+        upper = empty(n, dtype=engine.X.dtype)
+        lower = empty((n, starts.size), dtype=engine.X.dtype)
+        for chunk in engine.chunks(n, self.n_clusters):
+            dist_sq = engine.sq_distances(self.centroids, chunk)
+            rows = arange(dist_sq.shape[0])
+            self.labels_[chunk] = dist_sq.argmin(axis=1)
+            upper[chunk] = dist_sq[rows, self.labels_[chunk]]
+            dist_sq[rows, self.labels_[chunk]] = inf
+            lower[chunk] = minimum.reduceat(dist_sq[:, order], starts, axis=1)
+        sqrt(upper, out=upper)
+        sqrt(lower, out=lower)
+
+        for i in range(self.max_iter):
+            if i > 0:
+                self.__yinyang_assign(engine, upper, lower, group, members)
+            shift, converged = self.__shift_centroids(engine)
+            upper += shift[self.labels_]
+            lower -= maximum.reduceat(shift[order], starts)
+            maximum(lower, 0, out=lower)
+            if converged:
+                self.converged_ = True
+                break
+            if self.__out_of_time():
+                break
+        self.__yinyang_assign(engine, upper, lower, group, members)
+        self.__record_inertia(
+            engine,
+            engine.paired_sq_distances(arange(engine.X.shape[0]), self.centroids, self.labels_)
+        )
+
+    def __yinyang_assign(self,
+                         engine: DistanceEngine,
+                         upper: ndarray,
+                         lower: ndarray,
+                         group: ndarray,
+                         members: list[ndarray],
+                         /):
+        """
+        Yinyang assignment step; updates `self.labels_` and the bounds in place.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points.
+        upper : ndarray
+            Upper bounds to the assigned centroid, shape (n_samples,)
+        lower : ndarray
+            Lower bounds to each centroid group, shape (n_samples, n_groups)
+        group : ndarray
+            Group index of each centroid, shape (n_clusters,)
+        members : list[ndarray]
+            Centroid indices of each group.
+        """
+
+        global_lower = lower.min(axis=1)
+        active = nonzero(upper > global_lower)[0]
+        if active.size == 0:
+            return
+        labels = self.labels_[active]
+        upper[active] = sqrt(engine.paired_sq_distances(active, self.centroids, labels))
+        keep = upper[active] > global_lower[active]
+        active, labels = active[keep], labels[keep]
+        if active.size == 0:
+            return
+
+        own_dist = upper[active]
+        best_dist, best = own_dist.copy(), labels.copy()
+        rescanned = []
+        for g, centroid_ind in enumerate(members):
+            rows = nonzero(lower[active, g] < own_dist)[0]
+            if rows.size == 0:
+                continue
+            nearest, first, second = engine.two_nearest(self.centroids[centroid_ind], active[rows])
+            first, second = sqrt(first), sqrt(second)
+            nearest = centroid_ind[nearest]
+            better = (first < best_dist[rows]) | \
+                ((first == best_dist[rows]) & (nearest < best[rows]))
+            best_dist[rows[better]] = first[better]
+            best[rows[better]] = nearest[better]
+            rescanned.append((g, rows, nearest, first, second))
+
+        for g, rows, nearest, first, second in rescanned:
+            lower[active[rows], g] = where(best[rows] == nearest, second, first)
+        changed = nonzero(best != labels)[0]
+        old_group = group[labels[changed]]
+        lower[active[changed], old_group] = minimum(lower[active[changed], old_group], own_dist[changed])
+        self.labels_[active] = best
+        upper[active] = best_dist
+
+    def __minibatch_step(self, engine: DistanceEngine, rows: ndarray | None, /) -> float:
+        """
+        Move the centroids towards one mini-batch with per-centroid learning rates.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points.
+        rows : ndarray | None
+            Indices of the batch samples; all samples of `engine` if None.
+
+        Returns
+        -------
+        batch_inertia : float
+            Sum of squared distances of the batch to its closest centroid,
+            measured before the update.
+
+        Notes
+        -----
+        Each centroid keeps the number of samples it has absorbed in
+        `self.counts_` and moves by count_in_batch / counts_ towards the batch
+        mean, so its learning rate decays as it accumulates samples.
+        """
+
+        labels, min_dist_sq = engine.nearest(self.centroids, rows)
+        X = engine.X if rows is None else engine.X[rows]
+        if self.__sums is None or self.__sums.shape != self.centroids.shape:
+            self.__sums = empty(self.centroids.shape, dtype=self.__accumulator_dtype())
+        self.__sums.fill(0)
+        scatter_add(self.__sums, labels, X)
+        batch_counts = bincount(labels, minlength=self.n_clusters)
+        self.counts_ += batch_counts
+        non_empty = batch_counts > 0
+        self.centroids[non_empty] += (
+            self.__sums[non_empty] - batch_counts[non_empty, None] * self.centroids[non_empty]
+        ) / self.counts_[non_empty, None]
+        self.labels_ = labels
+        return float(min_dist_sq.sum(dtype=float64))
+
+    def __minibatch_converged(self, batch_inertia: float, batch_size: int, n_samples: int, /) -> bool:
+        """
+        Update the smoothed inertia and report whether mini-batch training stalled.
+
+        Parameters
+        ----------
+        batch_inertia : float
+            Inertia of the latest batch.
+        batch_size : int
+            Number of samples in the latest batch.
+        n_samples : int
+            Size of the dataset the batches come from (samples seen so far for
+            `partial_fit`); sets the smoothing factor.
+
+        Returns
+        -------
+        converged : bool
+            True once the smoothed inertia has not improved for
+            `self.max_no_improvement` consecutive batches.
+        """
+
+        batch_inertia /= batch_size
+        if self.ewa_inertia_ is None:
+            self.ewa_inertia_ = batch_inertia
+        else:
+            alpha = min(1.0, 2 * batch_size / (n_samples + 1))
+            self.ewa_inertia_ = self.ewa_inertia_ * (1 - alpha) + batch_inertia * alpha
+        if self.__ewa_inertia_min is None or self.ewa_inertia_ < self.__ewa_inertia_min:
+            self.__ewa_inertia_min = self.ewa_inertia_
+            self.__no_improvement = 0
+        else:
+            self.__no_improvement += 1
+        return self.__no_improvement >= self.max_no_improvement
+
+    def __reset_minibatch(self, /):
+        """
+        Clear the mini-batch state before a new fit.
+        """
+
+        self.counts_ = zeros(self.n_clusters, dtype=int)
+        self.ewa_inertia_ = None
+        self.converged_ = False
+        self.__ewa_inertia_min = None
+        self.__no_improvement = 0
+
+    def __fit_minibatch(self, engine: DistanceEngine, /):
+        """
+        Mini-batch KMeans: centroid updates from random batches of samples.
+
+        Runs up to `self.max_iter` epochs of `self.batch_size` batches and
+        stops early when the centroids move less than `self.tol` or the
+        smoothed batch inertia stops improving. A final full assignment pass
+        sets `self.labels_` and `self.inertia_` for every sample. With
+        sample weights, batches are drawn proportionally to the weights, so
+        every batch is an unweighted sample of the weighted data.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points to cluster.
+        """
+
+        n = engine.X.shape[0]
+        batch_size = min(self.batch_size, n)
+        rng = default_rng(self.random_state)
+        weights = engine.sample_weight
+        prob = None if weights is None else weights / weights.sum()
+        self.__reset_minibatch()
+        for step in range(self.max_iter * max(1, n // batch_size)):
+            rows = rng.integers(0, n, size=batch_size) if prob is None else rng.choice(n, size=batch_size, p=prob)
+            old_centroids = self.centroids.copy()
+            batch_inertia = self.__minibatch_step(engine, rows)
+            if allclose(old_centroids, self.centroids, atol=self.tol) or \
+                    self.__minibatch_converged(batch_inertia, batch_size, n):
+                self.converged_ = True
+                break
+            if self.__out_of_time():
+                break
+        self.labels_, min_dist_sq = self.__calculate_distance(engine)
+        self.__record_inertia(engine, min_dist_sq)
+
+    def __fit_bisecting(self, engine: DistanceEngine, /):
+        """
+        Bisecting KMeans: split one cluster in two until there are `n_clusters`.
+
+        The cluster picked by `self.bisecting_strategy` is split by a
+        2-cluster `Kmeans` fitted on that cluster's points only, and its
+        points go to the nearer of the two new centroids. Every split adds
+        two child nodes to the hierarchy stored in `tree_children_`,
+        `tree_centroids_` and `tree_labels_`.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points to cluster.
+
+        Raises
+        ------
+        ValueError
+            If `self.bisecting_strategy` is unknown, `self.init` is a centroid
+            array, or no cluster can be split any more before reaching
+            `n_clusters` (too few distinct points).
+
+        Notes
+        -----
+        - One split costs O(cluster size) instead of O(n_samples), so the
+          whole fit costs about O(n_samples * log(n_clusters)) per 2-means
+          iteration instead of O(n_samples * n_clusters).
+        - The split keeps the label of the parent for the first child and
+          gives the next free label to the second.
+        - Splitting always continues to `n_clusters`; the time budget only
+          shortens the 2-means fits, and `converged_` is True if all of them
+          converged.
+        """
+
+        if self.bisecting_strategy not in ('largest_sse', 'largest_cluster'):
+            raise ValueError('Invalid bisecting strategy')
+        if isinstance(self.init, ndarray):
+            raise ValueError('bisecting does not support init centroids')
+        n = engine.X.shape[0]
+        weights = ones(n) if engine.sample_weight is None else engine.sample_weight
+        self.labels_ = zeros(n, dtype=int)
+        root = empty((1, engine.X.shape[1]), dtype=self.__accumulator_dtype())
+        total = engine.cluster_sums(self.labels_, root)
+        root = (root / total[:, None]).astype(self.dtype)
+
+        members = [arange(n)]
+        root_dist_sq = engine.paired_sq_distances(members[0], root, self.labels_)
+        sse = [float(weights @ root_dist_sq)]
+        dist = [float(weights @ sqrt(root_dist_sq))]
+        size = [float(total[0])]
+        leaf = [0]
+        children = [[-1, -1]]
+        node_centroids = [root[0]]
+        seed = self.random_state if isinstance(self.random_state, SeedSequence) else SeedSequence(self.random_state)
+        seeds = seed.spawn(max(self.n_clusters - 1, 1))
+        converged = True
+        while len(members) < self.n_clusters:
+            score = array(sse if self.bisecting_strategy == 'largest_sse' else size)
+            score[array(sse) <= 0] = -1
+            c = int(score.argmax())
+            if score[c] < 0:
+                raise ValueError('Cannot split further: fewer distinct samples than n_clusters')
+
+            rows = members[c]
+            X = engine.X[rows]
+            row_weight = None if engine.sample_weight is None else engine.sample_weight[rows]
+            halves = Kmeans(
+                2, self.max_iter, self.tol, self.init, seeds[len(members) - 1],
+                memory_budget=self.memory_budget,
+                n_local_trials=self.n_local_trials,
+                chain_length=self.chain_length,
+                n_jobs=self.n_jobs,
+                dtype=self.dtype,
+                sum_dtype=self.sum_dtype,
+                deadline=self.__deadline
+            ).fit(X, row_weight)
+            converged = converged and halves.converged_
+            side, dist_sq = DistanceEngine(X, self.memory_budget, self.n_jobs).nearest(halves.centroids)
+            split_sse = bincount(side, weights=weights[rows] * dist_sq, minlength=2)
+            split_dist = bincount(side, weights=weights[rows] * sqrt(dist_sq), minlength=2)
+            split_size = bincount(side, weights=weights[rows], minlength=2)
+
+            first, second = len(children), len(children) + 1
+            children[leaf[c]] = [first, second]
+            children += [[-1, -1], [-1, -1]]
+            node_centroids += [halves.centroids[0], halves.centroids[1]]
+            members[c] = rows[side == 0]
+            members.append(rows[side == 1])
+            self.labels_[members[-1]] = len(members) - 1
+            leaf[c] = first
+            leaf.append(second)
+            sse[c], dist[c], size[c] = float(split_sse[0]), float(split_dist[0]), float(split_size[0])
+            sse.append(float(split_sse[1]))
+            dist.append(float(split_dist[1]))
+            size.append(float(split_size[1]))
+
+        self.tree_children_ = array(children)
+        self.tree_centroids_ = array(node_centroids)
+        self.tree_labels_ = full(len(children), -1)
+        self.tree_labels_[leaf] = arange(len(leaf))
+        self.centroids = self.tree_centroids_[leaf]
+        self.cluster_sse_, self.cluster_dist_, self.cluster_sizes_ = array(sse), array(dist), array(size)
+        self.converged_ = converged
+        self.inertia_ = float(self.cluster_sse_.sum())
+
+    def __descend_tree(self, engine: DistanceEngine, /) -> ndarray:
+        """
+        Assign samples by walking down the 'bisecting' hierarchy.
+
+        Parameters
+        ----------
+        engine : DistanceEngine
+            Distance engine built for the data points to assign.
+
+        Returns
+        -------
+        cluster_labels : ndarray
+            Label of the leaf each sample ends in, shape (n_samples,)
+
+        Notes
+        -----
+        Every level costs two paired distances per sample, so a descent is
+        O(depth * n_features) per sample instead of O(n_clusters * n_features).
+        It reproduces the split decisions of the fit, which is why it can
+        differ from the flat nearest centroid.
+        """
+
+        node = zeros(engine.X.shape[0], dtype=int)
+        active = arange(engine.X.shape[0])
+        while active.size:
+            left = self.tree_children_[node[active], 0]
+            active, left = active[left >= 0], left[left >= 0]
+            if not active.size:
+                break
+            right = self.tree_children_[node[active], 1]
+            left_dist = engine.paired_sq_distances(active, self.tree_centroids_, left)
+            right_dist = engine.paired_sq_distances(active, self.tree_centroids_, right)
+            node[active] = where(right_dist < left_dist, right, left)
+        return self.tree_labels_[node]
+
+    def __reset_tree(self, /):
+        """
+        Drop the 'bisecting' hierarchy once it no longer describes the centroids.
+        """
+
+        self.tree_children_ = None
+        self.tree_centroids_ = None
+        self.tree_labels_ = None
+
+    def __accumulate_chunks(self,
+                            source: ChunkSource,
+                            /,
+                            *,
+                            keep_labels: bool = True) -> tuple[ndarray | None, ndarray, ndarray, ndarray, ndarray]:
+        """
+        One assignment pass over a chunk source.
+
+        Parameters
+        ----------
+        source : ChunkSource
+            Re-iterable source of row chunks.
+        keep_labels : bool
+            Whether to collect the labels of all samples. Iteration passes
+            skip them, so they only hold one chunk's labels at a time.
+
+        Returns
+        -------
+        cluster_labels : ndarray | None
+            Index of the nearest centroid for each sample, shape (n_samples,);
+            None unless `keep_labels`
+        sums : ndarray
+            Per-cluster sum of assigned samples, shape (n_clusters, n_features)
+        counts : ndarray
+            Per-cluster number of assigned samples, shape (n_clusters,)
+        cluster_sse : ndarray
+            Per-cluster sum of squared distances of samples to their closest
+            centroid, shape (n_clusters,)
+        cluster_dist : ndarray
+            Per-cluster sum of distances of samples to their closest
+            centroid, shape (n_clusters,)
+        """
+
+        sums = zeros(self.centroids.shape, dtype=self.__accumulator_dtype())
+        counts = zeros(self.n_clusters, dtype=int)
+        cluster_sse = zeros(self.n_clusters)
+        cluster_dist = zeros(self.n_clusters)
+        cluster_labels = []
+        for chunk in source:
+            engine = DistanceEngine(chunk, self.memory_budget)
+            labels, min_dist_sq = engine.nearest(self.centroids)
+            scatter_add(sums, labels, chunk)
+            counts += bincount(labels, minlength=self.n_clusters)
+            cluster_sse += engine.cluster_totals(labels, self.n_clusters, min_dist_sq)
+            cluster_dist += engine.cluster_totals(labels, self.n_clusters, sqrt(min_dist_sq))
+            if keep_labels:
+                cluster_labels.append(labels)
+        return concatenate(cluster_labels) if keep_labels else None, sums, counts, cluster_sse, cluster_dist
+
+    def __fit_streaming(self, source: ChunkSource, /):
+        """
+        Fit on an out-of-core source, one chunk in memory at a time.
+
+        For 'lloyd', every iteration streams the chunks once and accumulates
+        per-cluster sums and counts. For 'minibatch', every chunk is split
+        into batches of `self.batch_size` rows. Peak memory is one chunk plus
+        O(n_clusters * n_features), besides the returned labels, which only
+        the final assignment pass collects.
+
+        Parameters
+        ----------
+        source : ChunkSource
+            Re-iterable source of row chunks.
+        """
+
+        if self.algorithm == 'minibatch':
+            self.__reset_minibatch()
+            n_seen = 0
+            for i in range(self.max_iter):
+                for chunk in source:
+                    for start in range(0, chunk.shape[0], self.batch_size):
+                        batch = chunk[start:start + self.batch_size]
+                        n_seen += batch.shape[0]
+                        batch_inertia = self.__minibatch_step(DistanceEngine(batch, self.memory_budget), None)
+                        if self.__minibatch_converged(batch_inertia, batch.shape[0], n_seen):
+                            self.converged_ = True
+                        if self.converged_ or self.__out_of_time():
+                            break
+                    if self.converged_ or self.__out_of_time():
+                        break
+                if self.converged_ or self.__out_of_time():
+                    break
+            self.labels_, _, counts, self.cluster_sse_, self.cluster_dist_ = self.__accumulate_chunks(source)
+            self.cluster_sizes_ = counts.astype(float64)
+            self.inertia_ = float(self.cluster_sse_.sum())
+            return
+
+        for i in range(self.max_iter):
+            _, sums, counts, _, _ = self.__accumulate_chunks(source, keep_labels=False)
+            old_centroids = self.centroids.copy()
+            non_empty = counts > 0
+            self.centroids[non_empty] = sums[non_empty] / counts[non_empty, None]
+            if allclose(old_centroids, self.centroids, atol=self.tol):
+                self.converged_ = True
+                break
+            if self.__out_of_time():
+                break
+        self.labels_, _, counts, self.cluster_sse_, self.cluster_dist_ = self.__accumulate_chunks(source)
+        self.cluster_sizes_ = counts.astype(float64)
+        self.inertia_ = float(self.cluster_sse_.sum())
+
+    def __fit_restarts(self, X: ndarray | spmatrix | sparray, /, sample_weight: ndarray | None = None):
+        """
+        Run `self.n_init` independent fits and keep the one with the lowest inertia.
 
         Parameters
         ----------
-        X : ndarray
+        X : ndarray | spmatrix | sparray
             Data points to cluster, shape (n_samples, n_features)
+        sample_weight : ndarray | None
+            Weight of every sample, shape (n_samples,)
+
+        Notes
+        -----
+        - Every run gets an independent RNG stream spawned from `self.random_state`.
+        - With `self.n_jobs` other than None or 1, runs execute in a process
+          pool and read `X` from a single shared-memory block instead of each
+          receiving a pickled copy. Sparse `X` does not fit in one block, so
+          its runs execute one after another, each using `self.n_jobs` threads.
+        """
+
+        runs = []
+        for seed in SeedSequence(self.random_state).spawn(self.n_init):
+            run = copy(self)
+            run.random_state, run.n_init, run.centroids = seed, 1, None
+            run.coreset_size, run.sample_size = None, None
+            run.time_budget, run.deadline = None, self.__deadline
+            run.n_jobs = self.n_jobs if issparse(X) else 1
+            runs.append(run)
+
+        fitted = _fit_runs(runs, X, sample_weight, self.n_jobs)
+        best = min(fitted, key=lambda run: run.inertia_)
+        self.centroids, self.labels_, self.inertia_ = best.centroids, best.labels_, best.inertia_
+        self.counts_, self.ewa_inertia_, self.converged_ = best.counts_, best.ewa_inertia_, best.converged_
+        self.cluster_sse_, self.cluster_dist_, self.cluster_sizes_ = \
+            best.cluster_sse_, best.cluster_dist_, best.cluster_sizes_
+        self.tree_children_, self.tree_centroids_, self.tree_labels_ = \
+            best.tree_children_, best.tree_centroids_, best.tree_labels_
+
+    def __subsample_size(self, n_samples: int, n_features: int, /) -> int:
+        """
+        Number of rows for a sample-then-refine fit.
+
+        Parameters
+        ----------
+        n_samples : int
+            Number of rows of `X`.
+        n_features : int
+            Number of columns of `X`.
+
+        Returns
+        -------
+        n_subsample : int
+            Subsample size, or `n_samples` when `self.sample_size` is None
+            or does not reduce the data.
+
+        Raises
+        ------
+        ValueError
+            If `self.sample_size` is neither None, 'auto' nor a positive int.
+        """
+
+        if self.sample_size is None:
+            return n_samples
+        if self.sample_size == 'auto':
+            size = max(100 * self.n_clusters, 2 ** 28 // (self.n_clusters * n_features))
+        elif isinstance(self.sample_size, int) and self.sample_size > 0:
+            size = self.sample_size
+        else:
+            raise ValueError("sample_size must be None, 'auto' or a positive int")
+        return min(n_samples, max(size, self.n_clusters))
+
+    def __fit_samples(self,
+                      fit_method: Callable[[DistanceEngine], None],
+                      X: ndarray | spmatrix | sparray,
+                      sample_weight: ndarray | None,
+                      /):
+        """
+        Fit on validated in-memory samples: restarts or one seeded run.
+
+        Parameters
+        ----------
+        fit_method : Callable
+            Iteration strategy selected from `self.algorithm`.
+        X : ndarray | spmatrix | sparray
+            Data points to cluster, shape (n_samples, n_features)
+        sample_weight : ndarray | None
+            Weight of every sample, shape (n_samples,)
+        """
+
+        if self.n_init > 1 and not isinstance(self.init, ndarray):
+            self.__fit_restarts(X, sample_weight)
+            return
+        if self.algorithm != 'bisecting':
+            self.__initialize_centroids(X, sample_weight)
+        fit_method(DistanceEngine(X, self.memory_budget, self.n_jobs, sample_weight=sample_weight))
+
+    def fit(self,
+            X: ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable[[], Iterator[ndarray]],
+            /,
+            sample_weight: ndarray | None = None) -> 'Kmeans':
+        """
+        Compute KMeans clustering.
+
+        Parameters
+        ----------
+        X : ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable
+            Data points to cluster, shape (n_samples, n_features). SciPy
+            sparse matrices are used in CSR format without densifying. A memmap,
+            a path to a `.npy` file, a re-iterable of row chunks or a callable
+            returning a new chunk iterator is fitted out-of-core.
+        sample_weight : ndarray | None
+            Weight of every sample, shape (n_samples,). It weights the seeding
+            probabilities, the centroid means and the inertia, so a fit on
+            deduplicated rows with their counts as weights matches a fit on
+            the rows with the duplicates expanded. In-memory input only.
 
         Returns
         -------
         self : Kmeans
             Fitted KMeans object with updated centroids and labels.
 
+        Raises
+        ------
+        ValueError
+            If `self.algorithm` is not a supported strategy, or does not
+            support out-of-core input, or if `sample_weight` is invalid or
+            given with out-of-core input, or if `self.init` is a centroid
+            array of the wrong shape.
+
         Notes
         -----
         - Stops early if centroids change less than `self.tol`.
         - Runs up to `self.max_iter` iterations.
-        - After fitting, `self.labels_` contains cluster labels.
+        - With `self.time_budget` or `self.deadline`, iterations stop once
+          time runs out, leaving the latest centroids and `self.converged_`
+          False. Seeding, coreset construction and the final assignment pass
+          are not interrupted, so large inputs should be combined with
+          `sample_size` to keep them short.
+        - After fitting, `self.labels_` contains cluster labels and
+          `self.inertia_` the within-cluster sum of squares. Both come from a
+          final assignment pass against the returned centroids, so they
+          agree with `predict` and `score` on `X`. For 'bisecting' both
+          follow the hierarchy, like `predict`, while `score` uses the
+          nearest centroid.
+        - `X` is converted to `self.dtype` once (no copy if it already has
+          that dtype); chunked inputs are converted chunk by chunk.
         """
-        self.__initialize_centroids(X)
-        for i in range(self.max_iter):
-            self.labels_ = self.__calculate_distance(X)
-            old_centroids = self.centroids.copy()
-            self.__update_centroids(X)
-            if allclose(old_centroids, self.centroids, atol=self.tol):
-                break
+
+        if self.algorithm == 'lloyd':
+            fit_method = self.__fit_lloyd
+        elif self.algorithm == 'elkan':
+            fit_method = self.__fit_elkan
+        elif self.algorithm == 'hamerly':
+            fit_method = self.__fit_hamerly
+        elif self.algorithm == 'yinyang':
+            fit_method = self.__fit_yinyang
+        elif self.algorithm == 'minibatch':
+            fit_method = self.__fit_minibatch
+        elif self.algorithm == 'bisecting':
+            fit_method = self.__fit_bisecting
+        else:
+            raise ValueError('Invalid algorithm')
+        self.__reset_tree()
+        self.index_ = None
+        self.converged_ = False
+        deadlines = [self.deadline, None if self.time_budget is None else time() + self.time_budget]
+        self.__deadline = min((t for t in deadlines if t is not None), default=None)
+        if ChunkSource.is_streaming(X):
+            if self.algorithm not in ('lloyd', 'minibatch'):
+                raise ValueError('Only lloyd and minibatch algorithms support out-of-core input')
+            if sample_weight is not None:
+                raise ValueError('sample_weight is not supported for out-of-core input')
+            source = ChunkSource(X, self.chunk_size, self.dtype)
+            self.__initialize_centroids(source)
+            self.__fit_streaming(source)
+            return self
+        X = as_samples(X, self.dtype)
+        sample_weight = check_sample_weight(sample_weight, X.shape[0])
+        n_subsample = self.__subsample_size(X.shape[0], X.shape[1])
+        if self.coreset_size is not None and X.shape[0] > self.coreset_size:
+            points, weights = Coreset(
+                self.n_clusters,
+                self.random_state,
+                size=self.coreset_size,
+                memory_budget=self.memory_budget
+            ).build(X, sample_weight)
+        elif n_subsample < X.shape[0]:
+            rows = sort(default_rng(self.random_state).choice(X.shape[0], size=n_subsample, replace=False))
+            points, weights = X[rows], None if sample_weight is None else sample_weight[rows]
+        else:
+            self.__fit_samples(fit_method, X, sample_weight)
+            return self
+        self.__fit_samples(fit_method, points, weights)
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs, sample_weight=sample_weight)
+        if self.refine_iter > 0:
+            self.__reset_tree()
+            self.converged_ = False
+        elif self.tree_children_ is not None:
+            self.labels_ = self.__descend_tree(engine)
+            self.__record_inertia(engine, engine.paired_sq_distances(arange(X.shape[0]), self.centroids, self.labels_))
+            return self
+        self.__fit_lloyd(engine, self.refine_iter)
         return self
 
-    def predict(self, X: ndarray, /) -> ndarray:
+    def fit_predict(self,
+                    X: ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable[[], Iterator[ndarray]],
+                    /,
+                    sample_weight: ndarray | None = None) -> ndarray:
+        """
+        Compute KMeans clustering and return the cluster label of every sample.
+
+        Parameters
+        ----------
+        X : ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable
+            Data points to cluster, as for `fit`.
+        sample_weight : ndarray | None
+            Weight of every sample, shape (n_samples,), as for `fit`.
+
+        Returns
+        -------
+        cluster_labels : ndarray
+            `self.labels_` after fitting, shape (n_samples,)
+
+        Notes
+        -----
+        The labels are those of the last assignment step of the fit, so no
+        extra pass over `X` is made.
+        """
+
+        return self.fit(X, sample_weight).labels_
+
+    def partial_fit(self, X: ndarray | spmatrix | sparray, /) -> 'Kmeans':
+        """
+        Update the centroids with a single mini-batch.
+
+        Parameters
+        ----------
+        X : ndarray | spmatrix | sparray
+            Batch of data points, shape (batch_size, n_features), dense or sparse.
+
+        Returns
+        -------
+        self : Kmeans
+            KMeans object with updated centroids.
+
+        Raises
+        ------
+        ValueError
+            If the first batch has fewer samples than `self.n_clusters`.
+
+        Notes
+        -----
+        - The first call initializes the centroids from the batch.
+        - `self.labels_` and `self.inertia_` describe the latest batch.
+        - `self.converged_` turns True once the smoothed batch inertia stops
+          improving; callers can use it to stop feeding data.
+        """
+
+        X = as_samples(X, self.dtype)
+        self.__reset_tree()
+        self.index_ = None
+        if self.centroids is None or self.counts_ is None:
+            if X.shape[0] < self.n_clusters:
+                raise ValueError('First batch must contain at least n_clusters samples')
+            self.__initialize_centroids(X)
+            self.__reset_minibatch()
+        batch_inertia = self.__minibatch_step(DistanceEngine(X, self.memory_budget), None)
+        self.inertia_ = batch_inertia
+        self.cluster_sse_, self.cluster_dist_, self.cluster_sizes_ = None, None, None
+        if self.__minibatch_converged(batch_inertia, X.shape[0], int(self.counts_.sum())):
+            self.converged_ = True
+        return self
+
+    def build_index(self, method: str = 'auto', /, *, eps: float = 0.0, n_groups: int | None = None) -> 'Kmeans':
+        """
+        Build a nearest-centroid index over the fitted centroids for `predict`.
+
+        Parameters
+        ----------
+        method : str
+            'kdtree' (KD-tree, best for low-dimensional data), 'pruned'
+            (centroid groups with triangle-inequality pruning), 'brute' (full
+            distance matrix) or 'auto' ('kdtree' up to 16 features, else 'pruned').
+        eps : float
+            Allowed relative distance error: 0 returns the nearest centroid,
+            larger values may return one at most (1 + eps) times farther in
+            exchange for faster queries.
+        n_groups : int | None
+            Number of centroid groups for 'pruned'. Defaults to sqrt(n_clusters).
+
+        Returns
+        -------
+        self : Kmeans
+            KMeans object with `self.index_` set.
+
+        Raises
+        ------
+        ValueError
+            If the model has not been fitted yet, or `method` or `eps` is invalid.
+
+        Notes
+        -----
+        Building costs about O(n_clusters^2 * n_features) for 'pruned' and
+        O(n_clusters * log(n_clusters)) for 'kdtree', once per fit; it pays
+        off when many more samples are predicted than there are centroids.
+        """
+
+        if self.centroids is None:
+            raise ValueError("Model is not fitted yet. Call `fit` first.")
+        self.index_ = CentroidIndex(
+            self.centroids,
+            method=method,
+            eps=eps,
+            n_groups=n_groups,
+            random_state=self.random_state,
+            memory_budget=self.memory_budget,
+            n_jobs=self.n_jobs
+        )
+        return self
+
+    def predict(self, X: ndarray | spmatrix | sparray, /) -> ndarray:
         """
         Predict the closest cluster each sample in X belongs to.
 
         Parameters
         ----------
-        X : ndarray
-            Data points to assign, shape (n_samples, n_features)
+        X : ndarray | spmatrix | sparray
+            Data points to assign, shape (n_samples, n_features), dense or sparse.
 
         Returns
         -------
@@ -160,9 +1540,265 @@ class Kmeans:
         ------
         ValueError
             If the model has not been fitted yet (`self.centroids` is None).
+
+        Notes
+        -----
+        - With an index from `build_index`, samples are assigned through it.
+        - Otherwise models fitted with 'bisecting' descend their hierarchy
+          instead of comparing every centroid, which matches the labels of
+          the fit.
+        """
+
+        if self.centroids is None:
+            raise ValueError("Model is not fitted yet. Call `fit` first.")
+        X = as_samples(X, self.dtype)
+        if self.index_ is not None:
+            cluster_labels, _ = self.index_.query(X)
+            return cluster_labels
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs)
+        if self.tree_children_ is not None:
+            return self.__descend_tree(engine)
+        cluster_labels, _ = self.__calculate_distance(engine)
+        return cluster_labels
+
+
+    def predict_iter(self,
+                     X: ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable[[], Iterator[ndarray]],
+                     /,
+                     out: ndarray | None = None) -> Iterator[ndarray]:
+        """
+        Predict cluster labels chunk by chunk for inputs that do not fit in memory.
+
+        Parameters
+        ----------
+        X : ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable
+            Data points to assign: an array, memmap or sparse matrix (split into
+            chunks of `self.chunk_size` rows), a path to a `.npy` file (opened
+            memory-mapped), an iterable or iterator of row chunks, or a
+            callable returning a chunk iterator.
+        out : ndarray | None
+            Optional buffer of shape (n_samples,), e.g. a writable memmap,
+            that receives the labels of every chunk at its row offset.
+
+        Yields
+        ------
+        cluster_labels : ndarray
+            Labels of one chunk; a view of `out` when it is given.
+
+        Raises
+        ------
+        ValueError
+            If the model has not been fitted yet, or `out` has fewer rows than `X`.
+
+        Notes
+        -----
+        - Only one chunk and its labels are in memory at a time, besides `out`.
+        - Every chunk goes through `predict`, so an index from `build_index`
+          is used as well.
+        """
+
+        if self.centroids is None:
+            raise ValueError("Model is not fitted yet. Call `fit` first.")
+        chunks = X if isinstance(X, Iterator) else ChunkSource(X, self.chunk_size, self.dtype)
+        start = 0
+        for chunk in chunks:
+            cluster_labels = self.predict(chunk)
+            if out is not None:
+                if start + cluster_labels.size > out.shape[0]:
+                    raise ValueError('out has fewer rows than X')
+                out[start:start + cluster_labels.size] = cluster_labels
+                cluster_labels = out[start:start + cluster_labels.size]
+            start += cluster_labels.size
+            yield cluster_labels
+
+    def transform(self, X: ndarray | spmatrix | sparray, /) -> ndarray:
+        """
+        Compute the distance from every sample to every centroid.
+
+        Parameters
+        ----------
+        X : ndarray | spmatrix | sparray
+            Data points, shape (n_samples, n_features), dense or sparse.
+
+        Returns
+        -------
+        distances : ndarray
+            Euclidean distances of shape (n_samples, n_clusters), in `self.dtype`.
+
+        Raises
+        ------
+        ValueError
+            If the model has not been fitted yet (`self.centroids` is None).
+
+        Notes
+        -----
+        The result is filled block by block within `self.memory_budget`; for
+        inputs whose distance matrix does not fit in memory, use
+        `predict_iter` or call `transform` per chunk.
         """
 
         if self.centroids is None:
             raise ValueError("Model is not fitted yet. Call `fit` first.")
-        cluster_labels = self.__calculate_distance(X)
-        return cluster_labels
\ No newline at end of file
+        X = as_samples(X, self.dtype)
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs)
+        distances = empty((X.shape[0], self.n_clusters), dtype=X.dtype)
+
+        def measure(chunk: slice):
+            sqrt(engine.sq_distances(self.centroids, chunk), out=distances[chunk])
+
+        engine.map_chunks(measure, X.shape[0], self.n_clusters)
+        return distances
+
+    def score(self,
+              X: ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable[[], Iterator[ndarray]],
+              /,
+              sample_weight: ndarray | None = None) -> float:
+        """
+        Opposite of the KMeans objective of `X` under the fitted centroids.
+
+        Parameters
+        ----------
+        X : ndarray | spmatrix | sparray | str | PathLike | Iterable[ndarray] | Callable
+            Data points, in memory or as row chunks like for `predict_iter`.
+        sample_weight : ndarray | None
+            Weight of every sample, shape (n_samples,). In-memory input only.
+
+        Returns
+        -------
+        score : float
+            Minus the (weighted) sum of squared distances of the samples to
+            their closest centroid, so higher is better.
+
+        Raises
+        ------
+        ValueError
+            If the model has not been fitted yet, or `sample_weight` is
+            invalid or given with chunked input.
+
+        Notes
+        -----
+        Chunked input is scored one chunk at a time, accumulated in float64.
+        Distances are exact: neither `index_` nor the 'bisecting' hierarchy is used.
+        """
+
+        if self.centroids is None:
+            raise ValueError("Model is not fitted yet. Call `fit` first.")
+        if isinstance(X, Iterator) or ChunkSource.is_streaming(X):
+            if sample_weight is not None:
+                raise ValueError('sample_weight is not supported for out-of-core input')
+            chunks = X if isinstance(X, Iterator) else ChunkSource(X, self.chunk_size, self.dtype)
+            inertia = 0.0
+            for chunk in chunks:
+                _, min_dist_sq = DistanceEngine(as_samples(chunk, self.dtype), self.memory_budget).nearest(self.centroids)
+                inertia += float(min_dist_sq.sum(dtype=float64))
+            return -inertia
+        X = as_samples(X, self.dtype)
+        sample_weight = check_sample_weight(sample_weight, X.shape[0])
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs, sample_weight=sample_weight)
+        _, min_dist_sq = engine.nearest(self.centroids)
+        return -engine.weighted_sum(min_dist_sq)
+
+
+def _fit_shared(kmeans: Kmeans,
+                shm_name: str,
+                shape: tuple[int, ...],
+                dtype: str,
+                sample_weight: ndarray | None,
+                required: bool,
+                /) -> Kmeans | None:
+    """
+    Process-pool entry point for `Kmeans.n_init` runs.
+
+    Parameters
+    ----------
+    kmeans : Kmeans
+        Unfitted single-run estimator.
+    shm_name : str
+        Name of the shared-memory block holding `X`.
+    shape : tuple[int, ...]
+        Shape of `X`.
+    dtype : str
+        Dtype string of `X`.
+    sample_weight : ndarray | None
+        Weight of every sample of `X`.
+    required : bool
+        Fit even if the deadline of `kmeans` has passed.
+
+    Returns
+    -------
+    kmeans : Kmeans | None
+        The fitted estimator, or None if it was skipped because a queued run
+        only started after its deadline.
+    """
+
+    if not required and kmeans.deadline is not None and time() >= kmeans.deadline:
+        return None
+    shm = SharedMemory(name=shm_name)
+    try:
+        with limit_blas_threads(1):
+            kmeans.fit(ndarray(shape, dtype=dtype, buffer=shm.buf), sample_weight)
+    finally:
+        shm.close()
+    return kmeans
+
+
+def _fit_runs(runs: list[Kmeans],
+              X: ndarray | spmatrix | sparray,
+              sample_weight: ndarray | None,
+              n_jobs: int | None,
+              /) -> list[Kmeans]:
+    """
+    Fit several independent estimators on the same data.
+
+    Parameters
+    ----------
+    runs : list[Kmeans]
+        Unfitted estimators.
+    X : ndarray | spmatrix | sparray
+        Data points to cluster, shape (n_samples, n_features)
+    sample_weight : ndarray | None
+        Weight of every sample, shape (n_samples,)
+    n_jobs : int | None
+        Worker processes; None or 1 fits the runs one after another, -1 uses all cores.
+
+    Returns
+    -------
+    fitted : list[Kmeans]
+        The fitted estimators, in the order of `runs`; runs skipped at their
+        deadline are left out.
+
+    Notes
+    -----
+    - Workers read `X` from a single shared-memory block instead of each
+      receiving a pickled copy. Sparse `X` does not fit in one block, so its
+      runs execute one after another.
+    - Runs that have not started when their `deadline` passes are skipped,
+      in the pool as well; the first run is always fitted.
+    """
+
+    n_jobs = cpu_count() if n_jobs == -1 else (n_jobs or 1)
+    if n_jobs == 1 or len(runs) == 1 or issparse(X):
+        fitted = []
+        for run in runs:
+            if fitted and run.deadline is not None and time() >= run.deadline:
+                break
+            fitted.append(run.fit(X, sample_weight))
+        return fitted
+    shm = SharedMemory(create=True, size=max(X.nbytes, 1))
+    try:
+        shared_X = ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)
+        shared_X[:] = X
+        del shared_X
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(runs))) as pool:
+            fitted = pool.map(
+                _fit_shared, runs,
+                [shm.name] * len(runs),
+                [X.shape] * len(runs),
+                [X.dtype.str] * len(runs),
+                [sample_weight] * len(runs),
+                [i == 0 for i in range(len(runs))]
+            )
+            return [run for run in fitted if run is not None]
+    finally:
+        shm.close()
+        shm.unlink()
\ No newline at end of file
@@ -0,0 +1,143 @@
+from numpy import ndarray, minimum, bincount, flatnonzero, concatenate, \
+    allclose, full, empty
+from numpy.random import default_rng
+from scipy.sparse import spmatrix, sparray
+from .distance import DistanceEngine, check_sample_weight
+from .kmeans_pp import KmeansPP
+
+
+class KmeansParallel:
+    """
+    Scalable KMeans++ (k-means||) clustering initialization.
+
+    Instead of one pass over the data per centroid, k-means|| runs a few
+    rounds that each oversample about `oversampling_factor * n_clusters`
+    candidates in a single pass. Candidates are weighted by the number (or
+    total weight) of samples closest to them and reclustered down to
+    `n_clusters` with weighted KMeans++ followed by weighted Lloyd iterations.
+
+    Attributes:
+        n_clusters (int): Number of clusters to initialize.
+        rng (np.random.Generator): NumPy random number generator, seeded for reproducibility.
+        oversampling_factor (float): Expected candidates per round, as a multiple of n_clusters.
+        n_rounds (int): Number of oversampling rounds (passes over the data).
+        memory_budget (int): Upper limit in bytes for one block of the distance matrix.
+        n_jobs (int | None): Worker threads for the passes over the data; -1 uses all cores.
+    """
+
+    def __init__(self,
+                 n_clusters: int = 2,
+                 random_state: int | None = None,
+                 /, *,
+                 oversampling_factor: float = 2.0,
+                 n_rounds: int = 5,
+                 memory_budget: int = 2 ** 28,
+                 n_jobs: int | None = None):
+
+        self.n_clusters = n_clusters
+        self.rng = default_rng(random_state)
+        self.oversampling_factor = oversampling_factor
+        self.n_rounds = n_rounds
+        self.memory_budget = memory_budget
+        self.n_jobs = n_jobs
+
+    def initialize_centroids(self, X: ndarray | spmatrix | sparray, /, sample_weight: ndarray | None = None) -> ndarray:
+        """
+        Initialize centroids using the k-means|| algorithm.
+
+        Args:
+            X (np.ndarray | scipy.sparse matrix): Input data of shape (n_samples, n_features).
+            sample_weight (np.ndarray | None): Weight of every sample, shape (n_samples,).
+
+        Returns:
+            np.ndarray: Initialized centroids of shape (n_clusters, n_features).
+
+        Algorithm:
+            1. Select the first candidate randomly from the data points.
+            2. For each round, keep every sample independently with probability
+               oversampling_factor * n_clusters * w(x) d(x)^2 / potential, then update
+               the nearest-candidate distances against the new candidates only.
+            3. Weight each candidate by the total weight of samples closest to it; the
+               closest candidate is tracked during the rounds, so no extra pass is needed.
+            4. Recluster the weighted candidates down to n_clusters.
+
+        Notes:
+            - Every pass goes through `DistanceEngine` in row chunks, and each
+              chunk is independent of the others, so with `n_jobs` the chunks
+              of a pass are processed by a thread pool.
+        """
+
+        n = X.shape[0]
+        sample_weight = check_sample_weight(sample_weight, n)
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs, sample_weight=sample_weight)
+        if sample_weight is None:
+            candidate_ind = [self.rng.integers(0, n, size=1)]
+        else:
+            candidate_ind = [self.rng.choice(n, size=1, p=sample_weight / sample_weight.sum())]
+        nearest, min_dist_sq = engine.nearest(engine.dense(candidate_ind[0]))
+        n_candidates = 1
+        oversampling = self.oversampling_factor * self.n_clusters
+
+        for _ in range(self.n_rounds):
+            score = min_dist_sq if sample_weight is None else min_dist_sq * sample_weight
+            potential = score.sum()
+            if potential <= 0:
+                break
+            prob = minimum(oversampling * score / potential, 1)
+            new_ind = flatnonzero(self.rng.random(n) < prob)
+            if new_ind.size == 0:
+                continue
+            candidate_ind.append(new_ind)
+            new_nearest, new_dist_sq = engine.nearest(engine.dense(new_ind))
+            closer = new_dist_sq < min_dist_sq
+            nearest[closer] = new_nearest[closer] + n_candidates
+            min_dist_sq[closer] = new_dist_sq[closer]
+            n_candidates += new_ind.size
+
+        candidate_ind = concatenate(candidate_ind)
+        weights = bincount(nearest, weights=sample_weight, minlength=n_candidates).astype(float)
+        if n_candidates < self.n_clusters:
+            extra = self.rng.choice(n, size=self.n_clusters - n_candidates, replace=False)
+            candidate_ind = concatenate([candidate_ind, extra])
+            weights = concatenate([weights, full(extra.size, 1.0)])
+        return self.__recluster(engine.dense(candidate_ind), weights)
+
+    def __recluster(self, candidates: ndarray, weights: ndarray, /, max_iter: int = 20) -> ndarray:
+        """
+        Reduce the weighted candidates to `n_clusters` centroids.
+
+        Args:
+            candidates (np.ndarray): Candidate centroids of shape (n_candidates, n_features).
+            weights (np.ndarray): Total weight of the samples closest to each candidate.
+            max_iter (int): Weighted Lloyd iterations after seeding.
+
+        Returns:
+            np.ndarray: Centroids of shape (n_clusters, n_features).
+
+        Notes:
+            - The candidate set is small (about oversampling_factor * n_clusters * n_rounds
+              rows), so this step is cheap compared with the passes over the data.
+            - Seeding is weighted KMeans++ on the shared RNG stream, and the
+              Lloyd step uses the engine's weighted cluster sums.
+        """
+
+        engine = DistanceEngine(candidates, self.memory_budget, self.n_jobs, sample_weight=weights)
+        centroids = KmeansPP(
+            self.n_clusters,
+            self.rng,
+            memory_budget=self.memory_budget,
+            n_jobs=self.n_jobs
+        ).initialize_centroids(candidates, weights)
+
+        sums = empty(centroids.shape)
+        for _ in range(max_iter):
+            labels, _ = engine.nearest(centroids)
+            totals = engine.cluster_sums(labels, sums)
+            non_empty = totals > 0
+            new_centroids = centroids.copy()
+            new_centroids[non_empty] = sums[non_empty] / totals[non_empty, None]
+            converged = allclose(centroids, new_centroids)
+            centroids = new_centroids
+            if converged:
+                break
+        return centroids
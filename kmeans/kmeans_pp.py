@@ -1,6 +1,9 @@
-from numpy import empty, ndarray
+from numpy import empty, ndarray, full, inf, minimum, ones, zeros, float64
 from numpy.random import default_rng
-from scipy.spatial.distance import cdist
+from numpy.typing import DTypeLike
+from scipy.sparse import spmatrix, sparray
+from .distance import DistanceEngine, as_samples, check_sample_weight
+from .streaming import ChunkSource
 
 
 class KmeansPP:
@@ -11,54 +14,217 @@ class KmeansPP:
     The KMeans++ initialization improves the speed of convergence and reduces
     the chances of poor clustering compared to random initialization.
 
+    With `n_local_trials` set, the greedy variant is used: several candidates
+    are drawn per step and the one that reduces the potential the most is kept.
+
     Attributes:
         n_clusters (int): Number of clusters to initialize.
         rng (np.random.Generator): NumPy random number generator, seeded for reproducibility.
+        memory_budget (int): Upper limit in bytes for one block of the distance matrix.
+        n_local_trials (int | None): Candidates drawn per step in greedy mode;
+            None draws a single candidate (classic KMeans++).
+        chunk_size (int): Rows per chunk when seeding from an out-of-core source.
+        dtype (DTypeLike | None): Dtype of the distance computations and of the
+            returned centroids; None keeps the dtype of the input.
+        n_jobs (int | None): Worker threads for the distance passes; -1 uses all cores.
     """
 
-    def __init__(self, n_clusters: int = 2, random_state: int | None = None, /):
+    def __init__(self,
+                 n_clusters: int = 2,
+                 random_state: int | None = None,
+                 /, *,
+                 memory_budget: int = 2 ** 28,
+                 n_local_trials: int | None = None,
+                 chunk_size: int = 65536,
+                 dtype: DTypeLike | None = None,
+                 n_jobs: int | None = None):
 
         self.n_clusters = n_clusters
         self.rng = default_rng(random_state)
-
-    def initialize_centroids(self, X: ndarray, /) -> ndarray:
+        self.memory_budget = memory_budget
+        self.n_local_trials = n_local_trials
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+        self.n_jobs = n_jobs
+
+    def initialize_centroids(self,
+                             X: ndarray | spmatrix | sparray | ChunkSource,
+                             /,
+                             sample_weight: ndarray | None = None) -> ndarray:
         """
         Initialize centroids using the KMeans++ algorithm.
 
         Args:
-            X (np.ndarray): Input data of shape (n_samples, n_features).
+            X (np.ndarray | scipy.sparse matrix | ChunkSource): Input data of shape
+                (n_samples, n_features), sparse (CSR) matrices included, or
+                anything `ChunkSource` accepts (memmap, `.npy` path, chunks).
+            sample_weight (np.ndarray | None): Weight of every sample, shape (n_samples,).
+                Seeding with integer weights matches seeding on the data with
+                every row repeated that many times. In-memory input only.
 
         Returns:
             np.ndarray: Initialized centroids of shape (n_clusters, n_features).
 
+        Raises:
+            ValueError: If `sample_weight` is invalid or given with out-of-core input.
+
         Algorithm:
-            1. Select the first centroid randomly from the data points.
+            1. Select the first centroid randomly (proportionally to the weights) from the data points.
             2. For each remaining centroid:
-                a. Compute squared distances from each point to the nearest existing centroid.
-                b. Compute probabilities proportional to these distances.
+                a. Update squared distances from each point to the nearest existing centroid
+                   against the most recently chosen centroid only.
+                b. Compute probabilities proportional to these distances times the weights.
                 c. Select a new centroid according to the computed probabilities.
+                   In greedy mode, draw `n_local_trials` candidates instead and keep
+                   the one with the lowest resulting potential.
+
+        Notes:
+            - The running minimum makes seeding O(n_samples * n_clusters)
+              distance evaluations instead of O(n_samples * n_clusters^2).
+            - Greedy candidates are scored together in one batched distance pass.
+            - Out-of-core sources are seeded chunk by chunk, see `__initialize_streaming`.
+            - Centroids are dense even for sparse input.
         """
 
+        if ChunkSource.is_streaming(X):
+            if sample_weight is not None:
+                raise ValueError('sample_weight is not supported for out-of-core input')
+            source = X if isinstance(X, ChunkSource) else ChunkSource(X, self.chunk_size, self.dtype)
+            return self.__initialize_streaming(source)
+
+        X = as_samples(X, self.dtype)
         n = X.shape[0]
-        centroids = empty((self.n_clusters, X.shape[1]))
-        first_ind = self.rng.integers(0, n)
-        centroids[0] = X[first_ind].copy()
+        sample_weight = check_sample_weight(sample_weight, n)
+        engine = DistanceEngine(X, self.memory_budget, self.n_jobs, sample_weight=sample_weight)
+        centroids = empty((self.n_clusters, X.shape[1]), dtype=X.dtype)
+        if sample_weight is None:
+            first_ind = self.rng.integers(0, n)
+        else:
+            first_ind = self.rng.choice(n, p=sample_weight / sample_weight.sum())
+        centroids[0] = engine.dense(first_ind)
+        min_dist_sq = full(n, inf, dtype=X.dtype)
 
         for i in range(1, self.n_clusters):
-            prob = self.__calculate_probability(X, centroids[:i, :])
-            new_cen_ind = self.rng.choice(n, p=prob)
-            centroids[i] = X[new_cen_ind].copy()
+            _, new_dist_sq = engine.nearest(centroids[i - 1:i])
+            minimum(min_dist_sq, new_dist_sq, out=min_dist_sq)
+            prob = self.__calculate_probability(
+                min_dist_sq if sample_weight is None else min_dist_sq * sample_weight
+            )
+            if self.n_local_trials is None:
+                new_cen_ind = self.rng.choice(n, p=prob)
+            else:
+                trial_ind = self.rng.choice(n, size=self.n_local_trials, p=prob)
+                potentials = engine.candidate_potentials(engine.dense(trial_ind), min_dist_sq)
+                new_cen_ind = trial_ind[potentials.argmin()]
+            centroids[i] = engine.dense(new_cen_ind)
 
         return centroids
 
 
-    def __calculate_probability(self, X: ndarray, centroids: ndarray, /) -> ndarray:
+    def __initialize_streaming(self, source: ChunkSource, /) -> ndarray:
+        """
+        Initialize centroids with KMeans++ without holding the data in memory.
+
+        Args:
+            source (ChunkSource): Re-iterable source of row chunks.
+
+        Returns:
+            np.ndarray: Initialized centroids of shape (n_clusters, n_features).
+
+        Notes:
+            - Every step is one pass over the chunks (two in greedy mode).
+            - As in memory, the squared distance of every sample to its
+              nearest chosen centroid is kept in one O(n_samples) array and
+              lowered chunk by chunk against the newest centroid only, during
+              the sampling pass of the next step. Seeding therefore costs
+              O(n_samples * n_clusters) distance evaluations, and memory stays
+              at one chunk plus that array and O(n_clusters * n_features).
+        """
+
+        first, n = self.__sample_stream(source, 1)
+        dtype = first.dtype if self.dtype is None else self.dtype
+        centroids = empty((self.n_clusters, first.shape[1]), dtype=dtype)
+        centroids[0] = first[0]
+        min_dist_sq = full(n, inf, dtype=dtype)
+        for i in range(1, self.n_clusters):
+            trials, _ = self.__sample_stream(source, self.n_local_trials or 1, min_dist_sq, centroids[i - 1:i])
+            if trials.shape[0] > 1:
+                potentials = zeros(trials.shape[0])
+                start = 0
+                for chunk in source:
+                    engine = DistanceEngine(chunk, self.memory_budget, self.n_jobs)
+                    potentials += engine.candidate_potentials(trials, min_dist_sq[start:start + chunk.shape[0]])
+                    start += chunk.shape[0]
+                trials = trials[[potentials.argmin()]]
+            centroids[i] = trials[0]
+        return centroids
+
+    def __sample_stream(self,
+                        source: ChunkSource,
+                        n_samples: int,
+                        /,
+                        min_dist_sq: ndarray | None = None,
+                        newest: ndarray | None = None) -> tuple[ndarray, int]:
+        """
+        Draw samples with probability proportional to their squared distance
+        to the chosen centroids, in a single pass over the chunks.
+
+        Args:
+            source (ChunkSource): Re-iterable source of row chunks.
+            n_samples (int): Number of independent draws.
+            min_dist_sq (np.ndarray | None): Squared distance of every sample to
+                its nearest chosen centroid, shape (n_rows,); None draws uniformly.
+            newest (np.ndarray | None): Centroid chosen since `min_dist_sq` was
+                last updated, shape (1, n_features). `min_dist_sq` is lowered
+                against it in place, chunk by chunk, before the draw.
+
+        Returns:
+            tuple[np.ndarray, int]: Drawn rows of shape (n_samples, n_features)
+            and the number of rows in the source.
+
+        Raises:
+            ValueError: If every sample coincides with a chosen centroid.
+
+        Notes:
+            - Weighted reservoir sampling: after a chunk with total weight w,
+              each draw is replaced by a row of that chunk with probability
+              w / (total weight seen so far).
+        """
+
+        picked = None
+        total = 0.0
+        start = 0
+        for chunk in source:
+            stop = start + chunk.shape[0]
+            if min_dist_sq is None:
+                weight = ones(chunk.shape[0])
+            else:
+                weight = min_dist_sq[start:stop]
+                if newest is not None:
+                    _, new_dist_sq = DistanceEngine(chunk, self.memory_budget, self.n_jobs).nearest(newest)
+                    minimum(weight, new_dist_sq, out=weight)
+            start = stop
+            chunk_total = weight.sum(dtype=float64)
+            if chunk_total <= 0:
+                continue
+            total += chunk_total
+            if picked is None:
+                picked = empty((n_samples, chunk.shape[1]), dtype=chunk.dtype)
+            replace = self.rng.random(n_samples) < chunk_total / total
+            if replace.any():
+                rows = self.rng.choice(chunk.shape[0], size=int(replace.sum()), p=weight / chunk_total)
+                picked[replace] = chunk[rows]
+        if picked is None:
+            raise ValueError('Cannot draw centroids: every sample coincides with a chosen centroid')
+        return picked, start
+
+    def __calculate_probability(self, min_dist_sq: ndarray, /) -> ndarray:
         """
         Compute probability of each sample to be selected as the next centroid.
 
         Args:
-            X (np.ndarray): Input data of shape (n_samples, n_features).
-            centroids (np.ndarray): Current centroids of shape (current_clusters, n_features).
+            min_dist_sq (np.ndarray): Squared distance from each sample to its nearest
+                chosen centroid (times its weight, if any), shape (n_samples,).
 
         Returns:
             np.ndarray: Probabilities for each data point, summing to 1.
@@ -67,9 +233,9 @@ class KmeansPP:
             - The probability for each point is proportional to the squared distance
               to its nearest existing centroid.
             - A small epsilon (1e-12) is added to prevent division by zero.
+            - The normalization is done in float64, so float32 distances still
+              give probabilities that sum to 1 within `Generator.choice` tolerance.
         """
 
-        dist_sq = cdist(X, centroids, 'sqeuclidean')
-        min_dist_sq = dist_sq.min(axis=1)
-        prob = min_dist_sq / (min_dist_sq.sum() + 1e-12)
+        prob = min_dist_sq / (min_dist_sq.sum(dtype=float64) + 1e-12)
         return prob
\ No newline at end of file
@@ -0,0 +1,175 @@
+from numpy import ndarray, bincount, floor, minimum, maximum, ones, arange, concatenate, \
+    sqrt, empty, where, inf, unique, add, fill_diagonal
+from numpy.random import default_rng
+from scipy.sparse import spmatrix, sparray
+from .distance import DistanceEngine, as_samples
+from .kmeans_model import Kmeans
+
+
+def stratified_sample(labels: ndarray,
+                      sample_size: int,
+                      /,
+                      random_state: int | None = None) -> tuple[ndarray, ndarray]:
+    """
+    Draw a sample with proportional allocation per cluster.
+
+    Args:
+        labels (np.ndarray): Cluster label of every sample, shape (n_samples,).
+        sample_size (int): Target number of sampled rows.
+        random_state (int | None): Seed for the draw.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Sorted sampled row indices and the
+        weight of every sampled row, i.e. cluster size / rows drawn from that
+        cluster, so weighted means over the sample estimate means over all rows.
+
+    Notes:
+        - Every cluster gets floor(sample_size * n_c / n_samples) rows but at
+          least two (or all of its rows if it has fewer), so small clusters
+          are still represented; the weights undo that oversampling.
+    """
+
+    rng = default_rng(random_state)
+    counts = bincount(labels)
+    alloc = minimum(counts, maximum(floor(sample_size * counts / labels.size).astype(int), 2))
+    order = labels.argsort(kind='stable')
+    starts = concatenate([[0], counts.cumsum()])
+    rows = concatenate([
+        rng.choice(order[starts[c]:starts[c + 1]], size=alloc[c], replace=False)
+        for c in range(counts.size) if alloc[c] > 0
+    ])
+    rows.sort()
+    return rows, (counts / maximum(alloc, 1))[labels[rows]]
+
+
+def silhouette_score(X: ndarray | spmatrix | sparray,
+                     labels: ndarray,
+                     /,
+                     sample_size: int | None = 10000,
+                     random_state: int | None = None,
+                     memory_budget: int = 2 ** 28) -> float:
+    """
+    Mean silhouette coefficient, estimated on a stratified sample.
+
+    Args:
+        X (np.ndarray | scipy.sparse matrix): Samples of shape (n_samples, n_features).
+        labels (np.ndarray): Cluster label of every sample, shape (n_samples,).
+        sample_size (int | None): Rows used for the estimate; None uses all
+            rows, which costs O(n_samples^2) distances.
+        random_state (int | None): Seed for the sample.
+        memory_budget (int): Upper limit in bytes for one block of the pairwise
+            distances. Blocks are capped at 32 MiB anyway: every block goes
+            through several elementwise passes, which are much faster in cache.
+
+    Returns:
+        float: Estimated mean silhouette in [-1, 1]; 0 when there are fewer
+        than two clusters.
+
+    Algorithm:
+        1. Draw a stratified sample S (see `stratified_sample`).
+        2. Sort S by cluster. For row blocks of S, compute the distances to
+           all of S and sum them over each cluster's contiguous columns, so no
+           |S| x |S| matrix is kept.
+        3. a(x) is the mean distance to the other sampled members of its
+           cluster, b(x) the smallest mean distance to another cluster, and
+           s(x) = (b - a) / max(a, b), with s = 0 for singleton clusters.
+        4. Average s with the stratification weights.
+    """
+
+    X = as_samples(X)
+    if bincount(labels).astype(bool).sum() < 2:
+        return 0.0
+    if sample_size is None or sample_size >= labels.size:
+        rows, weights = arange(labels.size), ones(labels.size)
+    else:
+        rows, weights = stratified_sample(labels, sample_size, random_state)
+    order = labels[rows].argsort(kind='stable')
+    rows, weights = rows[order], weights[order]
+    _, starts, sizes = unique(labels[rows], return_index=True, return_counts=True)
+    cluster = bincount(starts, minlength=rows.size).cumsum() - 1
+    sample = DistanceEngine(X[rows], min(memory_budget, 2 ** 25))
+    points = sample.dense(slice(None))
+    m = rows.size
+    silhouette = empty(m)
+
+    def measure(chunk: slice):
+        dist = sample.sq_distances(points, chunk)
+        dist_sums = add.reduceat(sqrt(dist, out=dist), starts, axis=1)
+        own = cluster[chunk]
+        local = arange(own.size)
+        a = dist_sums[local, own] / maximum(sizes[own] - 1, 1)
+        dist_sums /= sizes
+        dist_sums[local, own] = inf
+        b = dist_sums.min(axis=1)
+        silhouette[chunk] = where(sizes[own] > 1, (b - a) / maximum(maximum(a, b), 1e-12), 0)
+
+    sample.map_chunks(measure, m, m)
+    return float(silhouette @ weights / weights.sum())
+
+
+def davies_bouldin_score(centroids: ndarray, cluster_dist: ndarray, cluster_sizes: ndarray, /) -> float:
+    """
+    Davies-Bouldin index from per-cluster statistics, without a pass over the data.
+
+    Args:
+        centroids (np.ndarray): Centroids of shape (n_clusters, n_features).
+        cluster_dist (np.ndarray): Within-cluster sum of distances to the
+            centroid, shape (n_clusters,).
+        cluster_sizes (np.ndarray): Number of samples (total weight) per cluster, shape (n_clusters,).
+
+    Returns:
+        float: Mean over clusters of max_j (S_i + S_j) / d(c_i, c_j); lower
+        is better. 0 when there are fewer than two non-empty clusters.
+
+    Notes:
+        - The scatter S_i is the mean distance to the centroid, as in the
+          standard index (and scikit-learn); empty clusters are ignored.
+    """
+
+    non_empty = cluster_sizes > 0
+    if non_empty.sum() < 2:
+        return 0.0
+    centroids = centroids[non_empty].astype(float)
+    scatter = cluster_dist[non_empty] / cluster_sizes[non_empty]
+    separation = sqrt(DistanceEngine(centroids).sq_distances(centroids))
+    fill_diagonal(separation, inf)
+    ratio = (scatter[:, None] + scatter[None, :]) / maximum(separation, 1e-12)
+    fill_diagonal(ratio, 0)
+    return float(ratio.max(axis=1).mean())
+
+
+def fit_metrics(kmeans: Kmeans,
+                X: ndarray | spmatrix | sparray,
+                /,
+                silhouette_size: int | None = 10000,
+                random_state: int | None = None) -> dict:
+    """
+    Quality metrics of a fitted model on its training data.
+
+    Args:
+        kmeans (Kmeans): Model fitted on `X`, with `labels_`, `cluster_sse_`,
+            `cluster_dist_` and `cluster_sizes_` from its final assignment pass.
+        X (np.ndarray | scipy.sparse matrix): The training samples.
+        silhouette_size (int | None): Rows of the stratified silhouette sample;
+            None skips the silhouette.
+        random_state (int | None): Seed for the silhouette sample.
+
+    Returns:
+        dict: 'inertia', 'cluster_sse', 'cluster_sizes', 'davies_bouldin',
+        'silhouette' (None when skipped) and 'converged', as JSON-serializable values.
+
+    Notes:
+        - Inertia, per-cluster SSE, distance sums and sizes come from the fit itself; only
+          the silhouette touches `X` again, on the sample.
+    """
+
+    return {
+        'inertia': kmeans.inertia_,
+        'cluster_sse': kmeans.cluster_sse_.tolist(),
+        'cluster_sizes': kmeans.cluster_sizes_.tolist(),
+        'davies_bouldin': davies_bouldin_score(kmeans.centroids, kmeans.cluster_dist_, kmeans.cluster_sizes_),
+        'silhouette': None if silhouette_size is None else silhouette_score(
+            X, kmeans.labels_, silhouette_size, random_state, kmeans.memory_budget
+        ),
+        'converged': bool(kmeans.converged_)
+    }
\ No newline at end of file
@@ -0,0 +1,66 @@
+from collections.abc import Callable, Iterable, Iterator
+from os import PathLike
+from numpy import ndarray, memmap, load
+from numpy.typing import DTypeLike
+from scipy.sparse import issparse
+from .distance import as_samples
+
+
+class ChunkSource:
+    """
+    Re-iterable source of row chunks for out-of-core fitting.
+
+    Wraps a `numpy.memmap`, a path to a `.npy` file (opened memory-mapped),
+    a re-iterable of 2D chunks (e.g. a list of arrays) or a callable that
+    returns a fresh iterator of chunks on every call. Each iteration yields
+    in-memory arrays of at most `chunk_size` rows (array and sparse matrix
+    inputs) or the chunks as produced by the caller, cast to `dtype` when
+    one is given. Sparse chunks stay sparse, in CSR format.
+
+    Attributes:
+        data (np.ndarray | Iterable | Callable): Underlying data.
+        chunk_size (int): Maximum rows per chunk for array inputs.
+        dtype (DTypeLike | None): Dtype of the yielded chunks; None keeps the input dtype.
+    """
+
+    def __init__(self,
+                 data: ndarray | str | PathLike | Iterable[ndarray] | Callable[[], Iterator[ndarray]],
+                 chunk_size: int = 65536,
+                 dtype: DTypeLike | None = None,
+                 /):
+
+        if isinstance(data, (str, PathLike)):
+            data = load(data, mmap_mode='r')
+        elif isinstance(data, Iterator):
+            raise ValueError(
+                'Chunk iterators can be consumed only once; pass a list of chunks '
+                'or a callable that returns a new iterator'
+            )
+        self.data = data
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+
+    @staticmethod
+    def is_streaming(X: object, /) -> bool:
+        """
+        Tell whether `X` should be fitted out-of-core.
+
+        Args:
+            X (object): Input passed to `fit` or `initialize_centroids`.
+
+        Returns:
+            bool: True for memmaps, paths, iterables and callables; False for
+            regular in-memory arrays and SciPy sparse matrices.
+        """
+
+        return isinstance(X, memmap) or not (isinstance(X, ndarray) or issparse(X))
+
+    def __iter__(self) -> Iterator[ndarray]:
+        if isinstance(self.data, ndarray) or issparse(self.data):
+            data = as_samples(self.data) if issparse(self.data) else self.data
+            for start in range(0, data.shape[0], self.chunk_size):
+                yield as_samples(data[start:start + self.chunk_size], self.dtype)
+        else:
+            chunks = self.data() if callable(self.data) else self.data
+            for chunk in chunks:
+                yield as_samples(chunk, self.dtype)
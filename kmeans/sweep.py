@@ -0,0 +1,123 @@
+from collections.abc import Iterable
+from numpy import ndarray, array, float64
+from numpy.typing import DTypeLike
+from scipy.sparse import issparse, spmatrix, sparray
+from .kmeans_model import Kmeans, _fit_runs
+from .kmeans_pp import KmeansPP
+from .distance import as_samples, check_sample_weight
+from .metrics import silhouette_score
+
+
+class KmeansSweep:
+    """
+    KMeans fits for a range of cluster counts on the same data, e.g. to pick k.
+
+    KMeans++ seeding is sequential, so the first k seeds of a run for the
+    largest k are exactly the seeds of a run for k. The sweep therefore seeds
+    once for max(k_values) and starts every fit from a prefix of those seeds,
+    then runs the fits in parallel and scores every k by its inertia and a
+    sampled silhouette.
+
+    Attributes:
+        k_values (list[int]): Cluster counts to fit, sorted and deduplicated.
+        random_state (int | None): Seed for the shared seeding and the silhouette sample.
+        max_iter (int): Maximum iterations of every fit.
+        tol (float): Convergence tolerance of every fit.
+        algorithm (str): Iteration strategy of every fit (any `Kmeans.algorithm`
+            except 'bisecting').
+        n_local_trials (int | None): Greedy KMeans++ candidates per step.
+        silhouette_size (int | None): Rows of the stratified silhouette sample;
+            None skips the silhouette.
+        memory_budget (int): Upper limit in bytes for one block of the distance matrix.
+        n_jobs (int | None): Worker processes for the fits and threads for the
+            shared seeding; -1 uses all cores.
+        dtype (DTypeLike): Floating dtype of the computation.
+        inertia_ (np.ndarray | None): Inertia of every fit, aligned with `k_values`.
+        silhouette_ (np.ndarray | None): Estimated mean silhouette of every fit.
+        centroids_ (list[np.ndarray] | None): Centroids of every fit.
+    """
+
+    def __init__(self,
+                 k_values: Iterable[int],
+                 random_state: int | None = None,
+                 /, *,
+                 max_iter: int = 100,
+                 tol: float = 1e-4,
+                 algorithm: str = 'lloyd',
+                 n_local_trials: int | None = None,
+                 silhouette_size: int | None = 10000,
+                 memory_budget: int = 2 ** 28,
+                 n_jobs: int | None = None,
+                 dtype: DTypeLike = float64):
+
+        self.k_values = sorted(set(k_values))
+        self.random_state = random_state
+        self.max_iter = max_iter
+        self.tol = tol
+        self.algorithm = algorithm
+        self.n_local_trials = n_local_trials
+        self.silhouette_size = silhouette_size
+        self.memory_budget = memory_budget
+        self.n_jobs = n_jobs
+        self.dtype = dtype
+        self.inertia_ = None
+        self.silhouette_ = None
+        self.centroids_ = None
+
+    def fit(self, X: ndarray | spmatrix | sparray, /, sample_weight: ndarray | None = None) -> 'KmeansSweep':
+        """
+        Fit every cluster count in `k_values` on `X`.
+
+        Args:
+            X (np.ndarray | scipy.sparse matrix): Samples of shape (n_samples, n_features).
+            sample_weight (np.ndarray | None): Weight of every sample, shape (n_samples,);
+                it weights the seeding, the fits and the inertia.
+
+        Returns:
+            KmeansSweep: The sweep with `inertia_`, `silhouette_` and `centroids_` set.
+
+        Raises:
+            ValueError: If `k_values` is empty, contains values below 1 or above
+                n_samples, `self.algorithm` is 'bisecting', or `sample_weight` is invalid.
+
+        Notes:
+            - Seeding costs one KMeans++ pass for max(k_values) instead of one
+              per k; the fits share `X` through shared memory like `Kmeans.n_init` runs.
+            - The silhouette is unweighted and uses the same sample size for every k.
+        """
+
+        X = as_samples(X, self.dtype)
+        sample_weight = check_sample_weight(sample_weight, X.shape[0])
+        if not self.k_values or self.k_values[0] < 1 or self.k_values[-1] > X.shape[0]:
+            raise ValueError('k_values must lie between 1 and n_samples')
+        if self.algorithm == 'bisecting':
+            raise ValueError('bisecting does not support shared seeding')
+
+        seeds = KmeansPP(
+            self.k_values[-1],
+            self.random_state,
+            memory_budget=self.memory_budget,
+            n_local_trials=self.n_local_trials,
+            dtype=self.dtype,
+            n_jobs=self.n_jobs
+        ).initialize_centroids(X, sample_weight)
+        runs = [
+            Kmeans(
+                k, self.max_iter, self.tol, seeds[:k], self.random_state,
+                algorithm=self.algorithm,
+                memory_budget=self.memory_budget,
+                n_jobs=self.n_jobs if issparse(X) else 1,
+                dtype=self.dtype
+            )
+            for k in self.k_values
+        ]
+        fitted = _fit_runs(runs, X, sample_weight, self.n_jobs)
+
+        self.inertia_ = array([run.inertia_ for run in fitted])
+        self.centroids_ = [run.centroids for run in fitted]
+        if self.silhouette_size is not None:
+            self.silhouette_ = array([
+                silhouette_score(X, run.labels_, self.silhouette_size, self.random_state, self.memory_budget)
+                for run in fitted
+            ])
+        return self
\ No newline at end of file
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random
+from kmeans import Kmeans
+
+
+def blobs(n_samples, n_features, n_clusters, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, n_features)) * 3
+    return centers[rng.integers(0, n_clusters, n_samples)] + rng.normal(size=(n_samples, n_features))
+
+
+def fit(X, algorithm, n_clusters, sample_weight=None):
+    return Kmeans(n_clusters, 100, 1e-6, 'kmeans++', 0, algorithm=algorithm, n_groups=4).fit(X, sample_weight)
+
+
+@pytest.mark.parametrize('algorithm', ['elkan', 'hamerly', 'yinyang'])
+@pytest.mark.parametrize('n_features, n_clusters', [(2, 1), (2, 8), (8, 40), (64, 25)])
+def test_matches_lloyd(algorithm, n_features, n_clusters):
+    X = blobs(3000, n_features, n_clusters, n_features + n_clusters)
+    lloyd, accelerated = fit(X, 'lloyd', n_clusters), fit(X, algorithm, n_clusters)
+    np.testing.assert_array_equal(accelerated.labels_, lloyd.labels_)
+    np.testing.assert_allclose(accelerated.centroids, lloyd.centroids)
+    assert accelerated.converged_ == lloyd.converged_
+    assert accelerated.inertia_ == pytest.approx(lloyd.inertia_)
+    assert accelerated.inertia_ == pytest.approx(-accelerated.score(X))
+
+
+@pytest.mark.parametrize('algorithm', ['elkan', 'hamerly', 'yinyang'])
+def test_matches_lloyd_weighted(algorithm):
+    X = blobs(2000, 5, 12, 1)
+    weights = np.random.default_rng(2).integers(1, 5, X.shape[0]).astype(float)
+    lloyd, accelerated = fit(X, 'lloyd', 12, weights), fit(X, algorithm, 12, weights)
+    np.testing.assert_array_equal(accelerated.labels_, lloyd.labels_)
+    np.testing.assert_allclose(accelerated.centroids, lloyd.centroids)
+
+
+@pytest.mark.parametrize('algorithm', ['elkan', 'hamerly', 'yinyang'])
+def test_matches_lloyd_sparse(algorithm):
+    X = sparse_random(1500, 50, density=0.1, format='csr', random_state=3)
+    lloyd, accelerated = fit(X, 'lloyd', 10), fit(X, algorithm, 10)
+    np.testing.assert_array_equal(accelerated.labels_, lloyd.labels_)
+    np.testing.assert_allclose(accelerated.centroids, lloyd.centroids)
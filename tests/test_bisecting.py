@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+from kmeans import Kmeans
+
+
+def blobs(n_samples, n_features, n_clusters, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, n_features)) * 3
+    return centers[rng.integers(0, n_clusters, n_samples)] + rng.normal(size=(n_samples, n_features))
+
+
+@pytest.mark.parametrize('options', [
+    {}, {'sample_size': 3000}, {'coreset_size': 3000}, {'sample_size': 3000, 'n_init': 2}
+])
+def test_labels_follow_hierarchy(options):
+    X = blobs(20000, 4, 30, 0)
+    kmeans = Kmeans(30, 100, 1e-4, 'kmeans++', 0, algorithm='bisecting', **options).fit(X)
+    np.testing.assert_array_equal(kmeans.predict(X), kmeans.labels_)
+    dist_sq = ((X - kmeans.centroids[kmeans.labels_]) ** 2).sum(axis=1)
+    assert kmeans.inertia_ == pytest.approx(dist_sq.sum())